@@ -0,0 +1,60 @@
+#=======================================
+#    bench_imports.py
+#        Import-time benchmark. Imports each module in a fresh interpreter and reports
+#        how long it took and which heavy libraries it pulled in.
+#        Importing main/utils/summarize should stay cheap: heavy libraries belong to the stage that uses them.
+#
+#        python bench_imports.py
+#        python bench_imports.py --max-seconds 0.5 main utils summarize     (CI, exits 1 if slower)
+#=======================================
+
+import sys
+import json
+import argparse
+import subprocess
+
+MODULES = ['main', 'utils', 'summarize', 'pipeline', 'stages', 'url_index', 'waits', 'scrape', 'get_full_article', 'nlp_stream']
+HEAVY = ['selenium', 'pandas', 'pyarrow', 'numpy', 'spacy', 'torch', 'transformers', 'sentence_transformers',
+         'keybert', 'sklearn', 'boto3', 'psycopg2', 'bs4', 'lxml']
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(h for h in {heavy!r} if h in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+def measure(module, runs=3):
+    #   Best of a few runs, each in a fresh interpreter (nothing cached in sys.modules)
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            return {'error': (out.stderr.strip().splitlines() or ['import failed'])[-1]}
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import time per module")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--max-seconds', type=float, default=None, help="Fail if any module takes longer to import")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<20}{'seconds':>9}  heavy imports")
+    for module in args.modules:
+        result = measure(module, args.runs)
+        if 'error' in result:
+            print(f"{module:<20}{'-':>9}  {result['error']}")
+            failed = True
+            continue
+        print(f"{module:<20}{result['seconds']:>9.3f}  {', '.join(result['heavy']) or '-'}")
+        if args.max_seconds is not None and result['seconds'] > args.max_seconds:
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,89 @@
+#=======================================
+#    bench_keywords.py
+#        Fast keyword mode vs the full extractor on stored titles.
+#        Reports titles/sec for both, and how close the fast keywords get to the full ones, full mode
+#        taken as the reference: mean Jaccard, precision and recall per title, the share of all full
+#        mode keywords fast mode also finds, and the share of titles with at least one keyword in common.
+#        Titles come from stages/articles.parquet (an earlier run) or a text file, one title per line.
+#
+#        python bench_keywords.py
+#        python bench_keywords.py --titles titles.txt --limit 500 --show 10
+#=======================================
+
+import time
+import argparse
+
+import utils
+import stages
+
+def load_titles(path=None, limit=None):
+    if path:
+        with open(path, encoding='utf-8') as f:
+            titles = [line.strip() for line in f if line.strip()]
+    else:
+        titles = [t for t in stages.get('articles').column('Article Title').to_pylist() if t]
+    titles = list(dict.fromkeys(titles))
+    return titles[:limit] if limit else titles
+
+def run_full(titles):
+    sentence_model = utils.load_sentence_model()
+    nlp, kw_model, common_keywords, weights = utils.init_keywords(sentence_model)
+    #   Model loading isn't part of the per title cost
+    start = time.perf_counter()
+    embeddings = sentence_model.encode(titles)
+    keywords = utils.get_keywords_batch(titles, nlp, kw_model, common_keywords, weights, doc_embeddings=embeddings)
+    return keywords, time.perf_counter() - start
+
+def run_fast(titles):
+    matcher = utils.KeywordMatcher(utils.COMMON_KEYWORDS)
+    start = time.perf_counter()
+    keywords = [utils.get_keywords_fast(t, matcher, utils.WEIGHTS) for t in titles]
+    return keywords, time.perf_counter() - start
+
+def agreement(reference, candidate):
+    jaccard = precision = recall = 0.0
+    shared = total = any_shared = 0
+    for ref, cand in zip(reference, candidate):
+        ref, cand = set(ref), set(cand)
+        both = len(ref & cand)
+        union = len(ref | cand)
+        jaccard += both / union if union else 1.0
+        precision += both / len(cand) if cand else (1.0 if not ref else 0.0)
+        recall += both / len(ref) if ref else 1.0
+        shared += both
+        total += len(ref)
+        any_shared += bool(both) or not ref
+    n = max(len(reference), 1)
+    return {
+        'jaccard': jaccard / n, 'precision': precision / n, 'recall': recall / n,
+        #   Share of all full mode keywords fast mode also found
+        'overlap': shared / total if total else 1.0,
+        #   Titles where the two modes agree on at least one keyword (what clustering's keyword bonus needs)
+        'any_shared': any_shared / n,
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fast vs full keyword extraction")
+    parser.add_argument('--titles', default=None, help="Text file with one title per line (default: stages/articles.parquet)")
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--show', type=int, default=0, help="Print this many titles with both keyword lists")
+    args = parser.parse_args()
+
+    titles = load_titles(args.titles, args.limit)
+    print(f"{len(titles)} titles")
+
+    fast, fast_seconds = run_fast(titles)
+    full, full_seconds = run_full(titles)
+
+    print(f"{'mode':<6}{'seconds':>10}{'titles/sec':>14}")
+    for mode, seconds in (('full', full_seconds), ('fast', fast_seconds)):
+        print(f"{mode:<6}{seconds:>10.3f}{len(titles) / max(seconds, 1e-9):>14.1f}")
+    print(f"speedup: {full_seconds / max(fast_seconds, 1e-9):.1f}x")
+
+    scores = agreement(full, fast)
+    print(f"fast vs full: jaccard {scores['jaccard']:.3f}, precision {scores['precision']:.3f}, recall {scores['recall']:.3f}")
+    print(f"keyword overlap: {scores['overlap']:.1%} of full mode keywords also found by fast mode, "
+          f"{scores['any_shared']:.1%} of titles share at least one keyword")
+
+    for title, f, k in list(zip(titles, full, fast))[:args.show]:
+        print(f"\n{title}\n    full: {f}\n    fast: {k}")
@@ -0,0 +1,277 @@
+#=======================================
+#    bench_scrapers.py
+#        Offline benchmark for the site parsers.
+#
+#        record: visits each site once (live), saves section pages and a few article pages as fixtures:
+#                    fixtures/<SITE>/<hash>.rendered.html   DOM after JS, scripts stripped (browser paths)
+#                    fixtures/<SITE>/<hash>.raw.html        server response (static_scrape paths)
+#                    fixtures/manifest.json
+#        replay: serves the fixtures from a local HTTP server and times, per site,
+#                    static parse        pages/sec over the raw html
+#                    browser extraction  pages/sec, extraction time and WebDriver round trips per page
+#                    article readers     get_full_article readers on the recorded articles
+#
+#        python bench_scrapers.py record --sites FOX NPR
+#        python bench_scrapers.py replay --out bench.json
+#        python bench_scrapers.py replay --static-only --baseline bench.json --max-regression 0.25   (CI)
+#=======================================
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import quote
+
+import requests
+
+import driver_pool
+import static_scrape
+import extract
+
+FIXTURE_DIR = 'fixtures'
+MANIFEST = 'manifest.json'
+SCRIPT_TAG = re.compile(r'<script\b[^>]*>.*?</script>', re.S | re.I)
+
+#   Site name -> scrape.py entry point
+SITES = {
+    'FOX': 'foxnews',
+    'CNN': 'cnn',
+    'WAPO': 'wapo',
+    'NYT': 'nyt',
+    'AP': 'ap',
+    'NPR': 'npr',
+    'HuffPost': 'huffpost',
+    'CBS': 'cbs',
+}
+
+def fixture_name(url):
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+#===================================================================================
+#   Record
+#===================================================================================
+def discover_sections(site):
+    #   Run the site's own discovery, but capture the sections instead of scraping them
+    import scrape
+    from shared import DataCollector
+    captured = {}
+    real = scrape.run_sections
+    scrape.run_sections = lambda collector, source, section_dict, job: captured.update(section_dict)
+    try:
+        getattr(scrape, SITES[site])(DataCollector())
+    finally:
+        scrape.run_sections = real
+    return captured
+
+def save(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def record(sites, max_sections=3, max_articles=5):
+    manifest = load_manifest() if os.path.exists(os.path.join(FIXTURE_DIR, MANIFEST)) else {}
+    for site in sites:
+        site_dir = os.path.join(FIXTURE_DIR, site)
+        os.makedirs(site_dir, exist_ok=True)
+        entry = {'sections': [], 'articles': []}
+        sections = list(discover_sections(site).items())[:max_sections]
+        print(f"{site}: recording {len(sections)} sections")
+        with driver_pool.driver() as driver:
+            article_urls = []
+            for section, url in sections:
+                name = fixture_name(url)
+                driver.get(url)
+                for _ in extract_pages(driver):
+                    pass
+                save(os.path.join(site_dir, f'{name}.rendered.html'), SCRIPT_TAG.sub('', driver.page_source))
+                try:
+                    raw = requests.get(url, headers=static_scrape.HEADERS, timeout=static_scrape.TIMEOUT).text
+                    save(os.path.join(site_dir, f'{name}.raw.html'), raw)
+                except requests.RequestException:
+                    raw = None
+                entry['sections'].append({'section': section, 'url': url, 'name': name, 'raw': raw is not None})
+                article_urls += [r['url'] for r in extract.extract_records(driver, site) if r['url'] and r['title']]
+            for url in list(dict.fromkeys(article_urls))[:max_articles]:
+                name = fixture_name(url)
+                driver.get(url)
+                save(os.path.join(site_dir, f'{name}.rendered.html'), SCRIPT_TAG.sub('', driver.page_source))
+                entry['articles'].append({'url': url, 'name': name})
+        manifest[site] = entry
+    save(os.path.join(FIXTURE_DIR, MANIFEST), json.dumps(manifest, indent=2))
+
+#   Scroll a few screens so lazy content is in the snapshot
+def extract_pages(driver, steps=8):
+    for _ in range(steps):
+        driver.execute_script("window.scrollBy(0, 700);")
+        time.sleep(0.2)
+        yield
+
+def load_manifest():
+    with open(os.path.join(FIXTURE_DIR, MANIFEST)) as f:
+        return json.load(f)
+
+#===================================================================================
+#   Replay
+#===================================================================================
+class FixtureServer:
+    def __init__(self, root=FIXTURE_DIR):
+        handler = partial(QuietHandler, directory=root)
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.base = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def url(self, site, name, kind):
+        return f"{self.base}/{quote(site)}/{name}.{kind}.html"
+
+    def close(self):
+        self.httpd.shutdown()
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+class RoundTripCounter:
+    """Counts WebDriver commands sent by a driver while active."""
+    def __init__(self, driver):
+        self.executor = driver.command_executor
+        self.count = 0
+
+    def __enter__(self):
+        real = self.executor.execute
+        def counted(command, params):
+            self.count += 1
+            return real(command, params)
+        self.executor.execute = counted
+        return self
+
+    def __exit__(self, *exc):
+        del self.executor.execute
+
+def bench_static(server, site, entry):
+    sections = [s for s in entry['sections'] if s['raw']]
+    if site not in static_scrape.PARSERS or not sections:
+        return None
+    rows = 0
+    parse_time = 0.0
+    start = time.perf_counter()
+    for s in sections:
+        tree = static_scrape.fetch_page(server.url(site, s['name'], 'raw'))
+        t0 = time.perf_counter()
+        rows += len(static_scrape.PARSERS[site](tree))
+        parse_time += time.perf_counter() - t0
+    total = time.perf_counter() - start
+    return {'pages': len(sections), 'rows': rows, 'pages_per_sec': len(sections) / total, 'parse_sec': parse_time}
+
+def bench_browser(server, driver, site, entry):
+    if not entry['sections']:
+        return None
+    rows = 0
+    extract_time = 0.0
+    trips = 0
+    start = time.perf_counter()
+    for s in entry['sections']:
+        driver.get(server.url(site, s['name'], 'rendered'))
+        with RoundTripCounter(driver) as counter:
+            t0 = time.perf_counter()
+            rows += len(extract.extract_records(driver, site))
+            extract_time += time.perf_counter() - t0
+        trips += counter.count
+    total = time.perf_counter() - start
+    pages = len(entry['sections'])
+    return {'pages': pages, 'rows': rows, 'pages_per_sec': pages / total,
+            'extract_sec': extract_time, 'round_trips_per_page': trips / pages}
+
+def bench_readers(server, driver, site, entry):
+    import get_full_article
+    reader = get_full_article.READERS.get(site)
+    if reader is None or not entry['articles']:
+        return None
+    trips = 0
+    read_time = 0.0
+    ok = 0
+    for a in entry['articles']:
+        driver.get(server.url(site, a['name'], 'rendered'))
+        with RoundTripCounter(driver) as counter:
+            t0 = time.perf_counter()
+            try:
+                ok += bool(reader(driver))
+            except Exception:
+                pass
+            read_time += time.perf_counter() - t0
+        trips += counter.count
+    pages = len(entry['articles'])
+    return {'pages': pages, 'read_ok': ok, 'pages_per_sec': pages / read_time if read_time else 0.0,
+            'round_trips_per_page': trips / pages}
+
+def replay(sites=None, static_only=False):
+    manifest = load_manifest()
+    server = FixtureServer()
+    results = {}
+    try:
+        for site in sites or manifest:
+            entry = manifest[site]
+            results[site] = {'static': bench_static(server, site, entry)}
+        if not static_only:
+            with driver_pool.driver() as driver:
+                for site in sites or manifest:
+                    entry = manifest[site]
+                    results[site]['browser'] = bench_browser(server, driver, site, entry)
+                    results[site]['readers'] = bench_readers(server, driver, site, entry)
+    finally:
+        server.close()
+    return results
+
+def report(results):
+    print(f"{'site':<10}{'path':<10}{'pages':>7}{'rows':>7}{'pages/s':>10}{'trips/pg':>10}{'work s':>9}")
+    for site, paths in results.items():
+        for path, r in paths.items():
+            if r is None:
+                continue
+            work = r.get('parse_sec', r.get('extract_sec', 0.0))
+            trips = r.get('round_trips_per_page', float('nan'))
+            print(f"{site:<10}{path:<10}{r['pages']:>7}{r.get('rows', r.get('read_ok', 0)):>7}"
+                  f"{r['pages_per_sec']:>10.1f}{trips:>10.1f}{work:>9.3f}")
+
+#   Any site/path whose pages/sec fell by more than max_regression against the baseline
+def regressions(results, baseline, max_regression):
+    failed = []
+    for site, paths in results.items():
+        for path, r in paths.items():
+            base = baseline.get(site, {}).get(path)
+            if r is None or base is None:
+                continue
+            if r['pages_per_sec'] < base['pages_per_sec'] * (1 - max_regression):
+                failed.append(f"{site}/{path}: {r['pages_per_sec']:.1f} pages/s vs baseline {base['pages_per_sec']:.1f}")
+    return failed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record/replay benchmark for the site scrapers")
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('--sites', nargs='*', default=None, choices=list(SITES))
+    parser.add_argument('--max-sections', type=int, default=3)
+    parser.add_argument('--max-articles', type=int, default=5)
+    parser.add_argument('--static-only', action='store_true', help="Skip browser paths (no firefox needed)")
+    parser.add_argument('--out', help="Write results as json")
+    parser.add_argument('--baseline', help="Results json to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.mode == 'record':
+        record(args.sites or list(SITES), args.max_sections, args.max_articles)
+        sys.exit(0)
+
+    results = replay(args.sites, args.static_only)
+    report(results)
+    if args.out:
+        save(args.out, json.dumps(results, indent=2))
+    if args.baseline:
+        with open(args.baseline) as f:
+            failed = regressions(results, json.load(f), args.max_regression)
+        for line in failed:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if failed else 0)
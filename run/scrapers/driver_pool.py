@@ -0,0 +1,292 @@
+#=======================================
+#    driver_pool.py
+#        Shared pool of warm headless Firefox drivers.
+#        Used by scrape.py and get_full_article.py instead of each function starting its own browser.
+#=======================================
+
+import os
+import queue
+import threading
+import atexit
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.firefox.options import Options
+from selenium.common.exceptions import WebDriverException
+
+FIREFOX_MEM_MB = 600        #   Rough resident size of one headless firefox + geckodriver
+MAX_DRIVERS = 8             #   Most browsers open at once across all sites and sections, whatever CPU/memory allow
+MAX_PAGES = 40              #   Restart a browser after this many page loads (firefox leaks memory on long sessions)
+STARTUP_CONCURRENCY = 2     #   Browsers allowed to boot at the same time, avoids the startup memory spike
+QUIT_TIMEOUT = 5            #   Seconds to wait for a clean quit of a cancelled browser before killing geckodriver
+
+class Cancelled(Exception):
+    """Raised when a browser is requested or used on behalf of an owner (site) that has been cancelled."""
+    pass
+
+#===================================================================================
+#   Owners
+#       Leases are tagged with the owner set on the calling thread (e.g. the site being scraped),
+#       so a supervisor can cancel every browser a site holds.
+#===================================================================================
+_owner = threading.local()
+
+def current_owner():
+    return getattr(_owner, 'name', None)
+
+@contextmanager
+def owned_by(name):
+    previous = current_owner()
+    _owner.name = name
+    try:
+        yield
+    finally:
+        _owner.name = previous
+
+#===================================================================================
+#   Sizing
+#===================================================================================
+def available_memory_mb():
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return FIREFOX_MEM_MB * MAX_DRIVERS
+
+def default_pool_size():
+    #   Env override, mainly for small instances
+    if os.environ.get('SCRAPE_MAX_DRIVERS'):
+        return max(1, int(os.environ['SCRAPE_MAX_DRIVERS']))
+    cpu = os.cpu_count() or 1
+    mem = available_memory_mb() // FIREFOX_MEM_MB
+    return max(1, min(cpu, mem, MAX_DRIVERS))
+
+#===================================================================================
+#   Drivers
+#===================================================================================
+_startup_slots = threading.BoundedSemaphore(STARTUP_CONCURRENCY)
+
+def new_driver():
+    options = Options()
+    options.add_argument('-headless')
+    with _startup_slots:
+        driver = webdriver.Firefox(options=options)
+    driver.fullscreen_window()
+    return driver
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+class PooledDriver:
+    """Proxy around a WebDriver that counts page loads and restarts the browser when it is worn out or dead."""
+    def __init__(self, max_pages=MAX_PAGES):
+        self.max_pages = max_pages
+        self.pages = 0
+        self.owner = None
+        self.cancelled = False
+        self._driver = new_driver()
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def alive(self):
+        try:
+            self._driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def restart(self):
+        if self.cancelled:
+            raise Cancelled(f"Browser for {self.owner} was cancelled")
+        _quit(self._driver)
+        self._driver = new_driver()
+        self.pages = 0
+
+    def get(self, url):
+        if self.cancelled:
+            raise Cancelled(f"Browser for {self.owner} was cancelled")
+        if self.pages >= self.max_pages:
+            self.restart()
+        self.pages += 1
+        try:
+            return self._driver.get(url)
+        except WebDriverException:
+            #   Browser crashed: restart and try once more. A live browser means the page itself failed.
+            if self.alive():
+                raise
+            self.restart()
+            self.pages += 1
+            return self._driver.get(url)
+
+    def reset(self):
+        #   Leave the browser on a blank page between leases
+        self._driver.switch_to.default_content()
+        self._driver.get('about:blank')
+
+    def quit(self):
+        _quit(self._driver)
+
+    def cancel(self):
+        #   Called from another thread while the owner may be blocked in a command.
+        #       A clean quit can queue behind that command, so kill geckodriver if it takes too long.
+        self.cancelled = True
+        quitter = threading.Thread(target=_quit, args=(self._driver,), daemon=True)
+        quitter.start()
+        quitter.join(QUIT_TIMEOUT)
+        if quitter.is_alive():
+            process = getattr(getattr(self._driver, 'service', None), 'process', None)
+            if process is not None:
+                process.kill()
+
+#===================================================================================
+#   Pool
+#===================================================================================
+class DriverPool:
+    def __init__(self, size=None, max_pages=MAX_PAGES):
+        self.size = size or default_pool_size()
+        self.max_pages = max_pages
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._leased = 0
+        self._owned = {}            #   owner -> leased PooledDrivers
+        self._waiting = {}          #   owner -> acquires blocked on a free slot
+        self._cancelled = set()
+
+    def warm(self, n=None):
+        #   Boot browsers in the background so the first scrapers don't pay startup.
+        #       Holds a slot while booting so idle + leased never goes over the cap.
+        n = min(n or self.size, self.size)
+        def _boot():
+            for _ in range(n):
+                if not self._slots.acquire(blocking=False):
+                    return
+                try:
+                    with self._lock:
+                        if self._idle.qsize() + self._leased >= self.size:
+                            return
+                    self._idle.put(PooledDriver(self.max_pages))
+                except WebDriverException as e:
+                    print(f"Driver warmup failed: {e}")
+                    return
+                finally:
+                    self._slots.release()
+        threading.Thread(target=_boot, daemon=True).start()
+
+    def acquire(self, timeout=None):
+        owner = current_owner()
+        if owner in self._cancelled:
+            raise Cancelled(f"{owner} was cancelled")
+        with self._lock:
+            self._waiting[owner] = self._waiting.get(owner, 0) + 1
+        try:
+            acquired = self._slots.acquire(timeout=timeout)
+        finally:
+            with self._lock:
+                self._waiting[owner] -= 1
+        if not acquired:
+            raise TimeoutError("No browser available from the driver pool")
+        try:
+            with self._lock:
+                self._leased += 1
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    pooled = PooledDriver(self.max_pages)
+                    break
+                if pooled.alive():
+                    break
+                pooled.quit()
+            with self._lock:
+                if owner not in self._cancelled:
+                    pooled.owner = owner
+                    self._owned.setdefault(owner, set()).add(pooled)
+                    return pooled
+            #   Cancelled while we waited for a slot or booted the browser
+            self._idle.put(pooled)
+            raise Cancelled(f"{owner} was cancelled")
+        except BaseException:
+            with self._lock:
+                self._leased -= 1
+            self._slots.release()
+            raise
+
+    def release(self, pooled):
+        with self._lock:
+            self._leased -= 1
+            self._owned.get(pooled.owner, set()).discard(pooled)
+        try:
+            if pooled.cancelled or pooled.pages >= self.max_pages or not pooled.alive():
+                pooled.quit()
+                return
+            try:
+                pooled.reset()
+            except WebDriverException:
+                pooled.quit()
+                return
+            self._idle.put(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        finally:
+            self.release(pooled)
+
+    def cancel(self, owner):
+        """Quit every browser leased by `owner` and refuse it new ones until reopen(owner)."""
+        with self._lock:
+            self._cancelled.add(owner)
+            leased = list(self._owned.get(owner, ()))
+        for pooled in leased:
+            pooled.cancel()
+        return len(leased)
+
+    def stalled(self, owner):
+        """True while `owner` holds no browser and is waiting for one (queued behind other owners)."""
+        with self._lock:
+            return self._waiting.get(owner, 0) > 0 and not self._owned.get(owner)
+
+    def reopen(self, owner):
+        with self._lock:
+            self._cancelled.discard(owner)
+
+    def close(self):
+        #   Quit idle browsers. The pool stays usable, new leases start fresh browsers.
+        while True:
+            try:
+                self._idle.get_nowait().quit()
+            except queue.Empty:
+                break
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+        return _pool
+
+def driver(timeout=None):
+    return get_pool().driver(timeout)
+
+@atexit.register
+def _close_pool():
+    if _pool is not None:
+        _pool.close()
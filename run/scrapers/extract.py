@@ -0,0 +1,96 @@
+#=======================================
+#    extract.py
+#        Single round trip DOM extraction.
+#        Each site has one JavaScript snippet that collects every article on the page and returns
+#        a JSON array of {title, url, image, date, subheading} records, instead of one WebDriver
+#        call per field per article. Dates come back raw; scrape.py runs its date cleaners on them.
+#=======================================
+
+#   Helpers shared by every snippet.
+#       text() mirrors WebElement.text (rendered text, trimmed); href/src read the resolved property like get_attribute does.
+COMMON_JS = """
+const text = (el) => el ? (el.innerText || '').trim() : null;
+const one = (el, sel) => el ? el.querySelector(sel) : null;
+const all = (el, sel) => el ? Array.from(el.querySelectorAll(sel)) : [];
+const href = (el) => el ? (el.href || el.getAttribute('href')) : null;
+const src = (el) => el ? (el.src || el.getAttribute('src')) : null;
+"""
+
+#   Per site: NODES is a JS expression giving the article nodes, ITEM maps one node to a record.
+SITES = {
+    'FOX': {
+        'NODES': "all(document, 'article')",
+        'ITEM': """(el) => {
+            const links = all(el, 'a');
+            //  3rd link holds the headline, otherwise the first link with text
+            let title = links.length > 2 ? text(links[2]) : null;
+            if (title === null) {
+                const found = links.find(a => text(a) !== '');
+                title = found ? text(found) : null;
+            }
+            return {title: title, url: href(links[0]), image: src(one(el, 'img')),
+                    date: text(one(el, '.time')), subheading: null};
+        }""",
+    },
+    'CNN': {
+        'NODES': "all(document, 'a[href]')",
+        'ITEM': """(el) => ({title: text(el), url: href(el), image: null, date: null, subheading: null})""",
+    },
+    'WAPO': {
+        'NODES': """all(document, '[data-feature-id="homepage/story"]')""",
+        'ITEM': """(el) => ({title: text(one(el, '[data-qa="card-title"]')), url: href(one(el, 'a')),
+                    image: src(one(el, 'img')), date: null, subheading: text(one(el, 'p'))})""",
+    },
+    'NYT': {
+        'NODES': "all(document, 'article')",
+        'ITEM': """(el) => {
+            const a = one(el, 'a');
+            //  The date sits next to the article, not inside it
+            return {title: text(a), url: href(a), image: src(one(el, 'img')),
+                    date: text(one(el.parentNode, '[data-testid="todays-date"]')), subheading: text(one(el, 'p'))};
+        }""",
+    },
+    'AP': {
+        #   Skip first 2 segments; it's just the header section
+        'NODES': "all(document, '.PageList-items').slice(2).flatMap(seg => all(seg, '.PageList-items-item'))",
+        'ITEM': """(el) => {
+            const titles = all(el, '.PagePromoContentIcons-text');
+            const source = one(el, 'source');
+            return {title: titles.length ? text(titles[0]) : null, url: href(one(el, 'a')),
+                    image: source ? source.getAttribute('srcset') : null,
+                    date: null, subheading: titles.length > 1 ? text(titles[1]) : null};
+        }""",
+    },
+    'NPR': {
+        'NODES': "all(document, '.item.has-image')",
+        'ITEM': """(el) => {
+            const header = one(one(el, '.title'), 'a');
+            const teaser = one(el, '.teaser');
+            const time = one(teaser, 'time');
+            //  Subheading is the teaser text after the bullet separator
+            const sub = text(one(teaser, 'a'));
+            const dot = sub === null ? -1 : sub.indexOf('\\u2022');
+            return {title: text(header), url: href(header), image: src(one(one(el, 'picture'), 'img')),
+                    date: time ? time.getAttribute('datetime') : null,
+                    subheading: dot >= 0 ? sub.slice(dot + 1).trim() : sub};
+        }""",
+    },
+    'HuffPost': {
+        'NODES': "all(document, '.card.js-card')",
+        'ITEM': """(el) => ({title: text(one(el, '.card__headline__text')), url: href(one(el, 'a')),
+                    image: src(one(el, 'img')), date: null, subheading: text(one(el, '.card__description'))})""",
+    },
+    'CBS': {
+        'NODES': "all(document, 'article')",
+        'ITEM': """(el) => ({title: text(one(el, '.item__hed')), url: href(one(el, 'a')),
+                    image: src(one(el, 'img')), date: text(one(el, '.item__date')), subheading: text(one(el, '.item__dek'))})""",
+    },
+}
+
+def extract_script(source):
+    site = SITES[source]
+    return f"{COMMON_JS}\nconst item = {site['ITEM']};\nreturn {site['NODES']}.map(item);"
+
+def extract_records(driver, source):
+    """Return every article record on the current page in one execute_script call."""
+    return driver.execute_script(extract_script(source)) or []
@@ -9,14 +9,7 @@
 #
 
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
-from selenium.common.exceptions import StaleElementReferenceException
-from selenium.webdriver.firefox.options import Options
 
 
 import pandas as pd
@@ -24,24 +17,9 @@ import warnings
 warnings.filterwarnings("ignore")
 
 import numpy as np
-import requests
-from bs4 import BeautifulSoup
-
-import importlib
-import re
-import ast
 
 import utils
-
-class DataCollector:
-    def __init__(self):
-        self.data_list = []
-
-    def append_data(self, new_data):
-        self.data_list.append(new_data)
-
-    def get_dataframe(self):
-        return pd.DataFrame(self.data_list)
+import driver_pool
 
 #   Send the text corresponding to the article_id to database.
 def insert_articles(connection, df):
@@ -97,39 +75,37 @@ def cbs_reader(driver):
     body = ' '.join([p.text for p in ctx.find_elements(By.TAG_NAME,'p')])
     return body
 
+#   Source -> reader
+READERS = {
+    'CNN': cnn_reader,
+    'FOX': fox_reader,
+    'AP': ap_reader,
+    'NPR': npr_reader,
+    'HuffPost': hufpo_reader,
+    'CBS': cbs_reader
+}
+
 #   Get text from articles
 def read_articles(url_list):
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.fullscreen_window()
-
-    source_map = {
-        'CNN': cnn_reader,
-        'FOX': fox_reader,
-        'AP': ap_reader,
-        'NPR': npr_reader,
-        'HuffPost': hufpo_reader,
-        'CBS': cbs_reader
-    }
     ready_df = pd.DataFrame(columns=['article_id','article_content'])
-    for url,article_id,source in url_list:
-        #   Paywalled sources
-        if source in ['NYT','WAPO']:
-            body = np.NAN
+    #   Pooled browser, restarted by the pool every driver_pool.MAX_PAGES articles or if it crashes
+    with driver_pool.driver() as driver:
+        for url,article_id,source in url_list:
+            #   Paywalled sources
+            if source in ['NYT','WAPO']:
+                body = np.NAN
+                ready_df.loc[len(ready_df)] = [article_id,body]
+                continue
+            #print(source,url)
+            try:
+                driver.get(url)
+                reader_function = READERS[source]
+                body = reader_function(driver)
+            except:
+                body = np.NAN
+
             ready_df.loc[len(ready_df)] = [article_id,body]
-            continue
-        #print(source,url)
-        driver.get(url)
-        try:
-            reader_function = source_map[source]
-            body = reader_function(driver)
-        except:
-            body = np.NAN
-
-        ready_df.loc[len(ready_df)] = [article_id,body]
-
-    driver.quit()
+
     return ready_df
 
 #   DO NOT CALL.
@@ -0,0 +1,147 @@
+#=======================================
+#    images.py
+#        Image resolution for articles scraped without an inline image (FOX, CNN).
+#        All unresolved rows are fetched at once over a pooled keep-alive session, with a cap per host.
+#        Only the <head> is read at first (og:image); the full body is parsed only if that comes up empty.
+#        Results are cached by article url.
+#=======================================
+
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+MAX_WORKERS = 16
+PER_HOST = 6                # Concurrent requests to a single site
+TIMEOUT = (5, 10)           # (connect, read) seconds
+HEAD_LIMIT = 256 * 1024     # Give up looking for </head> after this many bytes
+CACHE_SIZE = 20000
+SOURCES = ('FOX', 'CNN')
+
+OG_IMAGE = re.compile(rb'<meta[^>]+(?:property|name)=["\']og:image["\'][^>]*>', re.I)
+CONTENT = re.compile(rb'content=["\']([^"\']+)["\']', re.I)
+
+#===================================================================================
+#   Session / limits / cache
+#===================================================================================
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update({'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0'})
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=MAX_WORKERS, max_retries=1)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+_host_slots = {}
+_host_lock = threading.Lock()
+
+def host_slot(url):
+    host = urlparse(url).netloc
+    with _host_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST)
+        return _host_slots[host]
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def cache_get(url):
+    with _cache_lock:
+        if url in _cache:
+            _cache.move_to_end(url)
+            return True, _cache[url]
+    return False, None
+
+def cache_put(url, image):
+    with _cache_lock:
+        _cache[url] = image
+        _cache.move_to_end(url)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+#===================================================================================
+#   Per-site filters (same rules get_img always used)
+#===================================================================================
+def valid_fox(image_url):
+    return bool(image_url) and not image_url.startswith('https://static.')
+
+def valid_cnn(image_url):
+    return bool(image_url) and 'face' not in image_url and image_url.startswith('https://')
+
+VALID = {'FOX': valid_fox, 'CNN': valid_cnn}
+
+#   Full page fallback, the original get_img logic
+def image_from_body(content, source):
+    images = BeautifulSoup(content, 'html.parser').find_all('img')
+    if source == 'FOX':
+        images = images[1:]     # Skipping the first image (site logo)
+    for img in images:
+        image_url = img.get('src')
+        if VALID[source](image_url):
+            return image_url
+    return None
+
+def image_from_head(head, source):
+    for tag in OG_IMAGE.findall(head):
+        found = CONTENT.search(tag)
+        if found:
+            image_url = found.group(1).decode('utf-8', 'ignore')
+            if VALID[source](image_url):
+                return image_url
+    return None
+
+#===================================================================================
+#   Resolution
+#===================================================================================
+def fetch_image(url, source):
+    with host_slot(url):
+        with get_session().get(url, stream=True, timeout=TIMEOUT) as response:
+            response.raise_for_status()
+            body = b''
+            chunks = response.iter_content(16 * 1024)
+            #   Read only until the end of <head>
+            for chunk in chunks:
+                body += chunk
+                if b'</head>' in body or len(body) >= HEAD_LIMIT:
+                    break
+            image = image_from_head(body.split(b'</head>', 1)[0], source)
+            if image is not None:
+                return image
+            #   No og:image, read the rest and scan every <img>
+            body += b''.join(chunks)
+            return image_from_body(body, source)
+
+def resolve_image(url, source):
+    if source not in VALID or not url:
+        return None
+    hit, image = cache_get(url)
+    if hit:
+        return image
+    try:
+        image = fetch_image(url, source)
+    except (requests.RequestException, ValueError):
+        return None     # Not cached, worth another try next run
+    cache_put(url, image)
+    return image
+
+def resolve_images(rows, sources=SOURCES, max_workers=MAX_WORKERS):
+    """Fill in 'Image' for every row from `sources` that doesn't have one. Rows are updated in place."""
+    pending = [row for row in rows if row.get('Image') is None and row.get('Source') in sources]
+    if not pending:
+        return rows
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+        found = executor.map(lambda row: resolve_image(row['Article URL'], row['Source']), pending)
+        for row, image in zip(pending, found):
+            row['Image'] = image
+    return rows
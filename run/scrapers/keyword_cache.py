@@ -0,0 +1,158 @@
+#=======================================
+#    keyword_cache.py
+#        Persistent keyword cache, so a headline seen in another section or on an earlier day
+#        doesn't go through spaCy/KeyBERT again.
+#        SQLite on disk, keyed by sha1(fingerprint + normalized title). The fingerprint hashes
+#        everything keywords depend on (weights, the common keyword list, both models' configs and
+#        EXTRACTOR_VERSIONS), so changing any of them starts a fresh cache instead of serving stale keywords.
+#        Each namespace (one per fingerprint, plus DB_MODE) is bounded to MAX_ENTRIES on its own, least
+#        recently used entries go first, so warming from the db can't push out fresh extractions.
+#        Namespaces nobody has read or written for STALE_DAYS (an old fingerprint) are dropped.
+#        Keywords warmed from the database are kept apart (DB_MODE, not tied to either extractor): the
+#        db copy has lost quotes, non-ascii characters and score order, and doesn't say which mode made
+#        it. They are only served for articles already in the database (nlp_stream.stored_keywords_for),
+#        never in place of a fresh extraction.
+#=======================================
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+import utils
+
+CACHE_PATH = 'keyword_cache.sqlite'
+MAX_ENTRIES = 200000        #   Per namespace
+STALE_DAYS = 30
+EXTRACTOR_VERSIONS = {'full': 2, 'fast': 2}      #   Bump a mode's version when its keyword logic in utils changes
+
+DB_MODE = 'db'              #   Keywords as stored in the database, whatever mode extracted them
+
+#   Case is kept (NER depends on it), only unicode form and whitespace are normalized
+def normalize_title(title):
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', str(title))).strip()
+
+def _read(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return b''
+
+#   mode: 'full' (spaCy + KeyBERT) or 'fast' (utils.get_keywords_fast), cached separately.
+#       single_parse (full mode, see utils.get_keywords_batch) changes the keywords, so it gets its own cache too
+def fingerprint(mode='full', single_parse=False):
+    digest = hashlib.sha1()
+    variant = [EXTRACTOR_VERSIONS.get(mode), mode, utils.WEIGHTS, utils.COMMON_KEYWORDS]
+    if single_parse:
+        variant.append('single_parse')
+    digest.update(json.dumps(variant, sort_keys=True).encode())
+    #   Model configs, not weights: cheap to read and they change whenever the model does
+    digest.update(_read(os.path.join(utils.SPACY_PATH, 'meta.json')))
+    digest.update(_read(os.path.join(utils.SENTENCE_MODEL_PATH, 'config.json')))
+    return digest.hexdigest()
+
+class KeywordCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, model_hash=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.model_hash = model_hash if model_hash is not None else fingerprint()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS keywords (key TEXT PRIMARY KEY, keywords TEXT, used REAL, namespace TEXT)")
+        #   Caches from before namespaces: old rows get adopted by the namespace that hits them
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(keywords)")]
+        if 'namespace' not in columns:
+            self.conn.execute("ALTER TABLE keywords ADD COLUMN namespace TEXT")
+        self.conn.execute("DROP INDEX IF EXISTS keywords_used")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS keywords_namespace_used ON keywords (namespace, used)")
+        #   Old fingerprints (and rows from before namespaces nobody adopted) are never hit again
+        self.conn.execute("""
+            DELETE FROM keywords WHERE COALESCE(namespace, '') IN
+                (SELECT COALESCE(namespace, '') FROM keywords GROUP BY namespace HAVING MAX(used) < ?)
+        """, (time.time() - STALE_DAYS * 86400,))
+        self.conn.commit()
+
+    def key(self, title):
+        return hashlib.sha1(f"{self.model_hash}\0{normalize_title(title)}".encode()).hexdigest()
+
+    def get_many(self, titles):
+        """title -> keywords for every title in the cache."""
+        keys = {self.key(t): t for t in titles}
+        found = {}
+        with self.lock:
+            items = list(keys)
+            for i in range(0, len(items), 500):
+                chunk = items[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, keywords FROM keywords WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                for key, keywords in rows:
+                    found[keys[key]] = json.loads(keywords)
+            #   Touch hits so they survive eviction
+            now = time.time()
+            self.conn.executemany("UPDATE keywords SET used = ?, namespace = ? WHERE key = ?",
+                                  [(now, self.model_hash, self.key(t)) for t in found])
+            self.conn.commit()
+        return found
+
+    def put_many(self, keywords_by_title, replace=True):
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        now = time.time()
+        rows = [(self.key(t), json.dumps(list(kws)), now, self.model_hash) for t, kws in keywords_by_title.items()]
+        with self.lock:
+            self.conn.executemany(f"{verb} INTO keywords (key, keywords, used, namespace) VALUES (?, ?, ?, ?)", rows)
+            self.conn.commit()
+            self._evict()
+        return len(rows)
+
+    #   Only this namespace counts against max_entries, other modes and the db warm keep their own room
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM keywords WHERE namespace = ?", (self.model_hash,)).fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute("""
+                DELETE FROM keywords WHERE key IN
+                    (SELECT key FROM keywords WHERE namespace = ? ORDER BY used LIMIT ?)
+            """, (self.model_hash, count - self.max_entries))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+def get_cache(mode='full', single_parse=False):
+    with _cache_lock:
+        if (mode, single_parse) not in _caches:
+            #   Modes share the file, the fingerprint keeps their keys apart
+            model_hash = DB_MODE if mode == DB_MODE else fingerprint(mode, single_parse)
+            _caches[mode, single_parse] = KeywordCache(model_hash=model_hash)
+        return _caches[mode, single_parse]
+
+#   Titles + keywords already in the database (recent articles first), into the DB_MODE cache.
+#       The db keeps keywords in id order, not score order.
+def warm_from_db(connection, days=30, batch_size=10000):
+    cache = get_cache(DB_MODE)
+    added = 0
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT a.title, array_agg(k.keyword ORDER BY k.keyword_id)
+            FROM articles a
+                JOIN junct_article_keywords jak ON jak.article_id = a.article_id
+                JOIN keywords k ON k.keyword_id = jak.keyword_id
+            WHERE a.date >= NOW() - make_interval(days => %s)
+            GROUP BY a.article_id, a.title, a.date
+            ORDER BY a.date DESC
+            LIMIT %s
+        """, (days, cache.max_entries))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            added += cache.put_many({title: kws for title, kws in rows if title})
+    return added
@@ -3,50 +3,21 @@
 #        This file defines the processing pipeline of the entire project.
 #=======================================
 
-import glob
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
-from selenium.common.exceptions import StaleElementReferenceException
-
-from selenium.webdriver.firefox.service import Service
-
-import requests
-from bs4 import BeautifulSoup
-
-import time
-from datetime import datetime, timedelta
-from datetime import date
+import os
 import re
-import pandas as pd
+import time
+import argparse
+import logging
 import warnings
+from datetime import date
 warnings.filterwarnings("ignore")
 
-import spacy
-from sentence_transformers import SentenceTransformer
-
-from concurrent.futures import ThreadPoolExecutor,wait
-
 import utils
-import scrape
-import get_full_article
-
-import boto3
-import os
-
-class DataCollector:
-    def __init__(self):
-        self.data_list = []
-
-    def append_data(self, new_data):
-        self.data_list.append(new_data)
+import stages
+import pipeline
 
-    def get_dataframe(self):
-        return pd.DataFrame(self.data_list)
+#   selenium, pandas, pyarrow, spacy, torch and boto3 are imported by the stages that use them,
+#       so a rerun of one late stage (--only-stage) doesn't pay for loading the scrapers or the models.
 
 #=====
 #   helpers
@@ -66,35 +37,70 @@ def safe_join(value):
 def clean_text(text):
     return re.sub(r'[^\x00-\x7F]+', '', text) 
 
+#   Stages keep keywords/urls/headlines as lists, the db still takes them as text (same format as always)
+def articles_for_db(df):
+    df = df.copy()
+    df['Keywords'] = df['Keywords'].apply(lambda kws: clean_text(str(list(kws))))
+    return df
+
+def simart_for_db(df):
+    df = df.copy()
+    df['Keywords'] = df['Keywords'].apply(lambda kws: clean_text(str(list(kws))))
+    df['Article Headlines'] = df['Article Headlines'].apply(safe_join)
+    df['Article URLs'] = df['Article URLs'].apply(safe_join)
+    return df
+
 #=====
 #   Main
 #=====
-def scrape_site(site):
-    name, func, output = site
-    print(name)
-    collector = DataCollector()
-    func(collector)
-    collector.get_dataframe().to_csv(output, index=False)
-
-def run():
+#   Scrape every site, hand the rows to the next stage ('scraped')
+def run(partial=True, processes=False, listener=None):
+    import pyarrow as pa
+    import scrape
+    import driver_pool
+    import url_index
+    import keyword_cache
+    import supervisor
+    import shared
+
     sites = [
-        ("FOX", scrape.foxnews, "fox.csv"),
-        ("AP", scrape.ap, "ap.csv"),
-        ("CBS", scrape.cbs, "cbs.csv"),
-        ("CNN", scrape.cnn, "cnn.csv"),
-        ("HUFF", scrape.huffpost, "huffpost.csv"),
-        ("NPR", scrape.npr, "npr.csv"),
-        ("NYT", scrape.nyt, "nyt.csv"),
-        ("WAPO",scrape.wapo,"wapo.csv")
+        ("FOX", scrape.foxnews),
+        ("AP", scrape.ap),
+        ("CBS", scrape.cbs),
+        ("CNN", scrape.cnn),
+        ("HUFF", scrape.huffpost),
+        ("NPR", scrape.npr),
+        ("NYT", scrape.nyt),
+        ("WAPO",scrape.wapo)
     ]
-    with ThreadPoolExecutor() as executor:
-        futures = [executor.submit(scrape_site, site) for site in sites]
-        wait(futures)
+    #   Sync the seen-url index with the database so scrapers skip articles we already have
+    try:
+        connection = utils.connect_db()
+        print(f"Seen-url index: {url_index.get_index().seed_from_db(connection)} new urls from db")
+        #   Keywords of recent articles, for the ones still on the section pages
+        print(f"Keyword cache: {keyword_cache.warm_from_db(connection)} titles from db")
+        connection.close()
+    except Exception as e:
+        print(f"Could not seed seen-url index / keyword cache from db, using local copies: {e}")
 
+    #   Each site gets a deadline (supervisor.SITE_TIMEOUTS); a hung site is cancelled and the rest carry on.
+    if processes:
+        #   One worker process per site, each with its own share of the browsers
+        status, tables = supervisor.run_site_processes(sites, partial=partial, listener=listener)
+    else:
+        #   Browsers come from the shared pool, which caps how many run at once (CPU/RAM).
+        #       Warm it while the threads start; sites beyond the cap wait for a free browser.
+        pool = driver_pool.get_pool()
+        pool.warm()
+        status, tables = supervisor.run_sites(sites, partial=partial, listener=listener)
+        #   Free the idle browsers before the NLP stages
+        pool.close()
+    print(f"Scrape status: {status}")
+
+    #   Only this run's sites, in site order
+    scraped = [tables[name] for name, _ in sites if name in tables]
+    return stages.put('scraped', pa.concat_tables(scraped) if scraped else shared.SCHEMA.empty_table())
 
-import boto3
-import logging
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
 
 # Configure logging
 logging.basicConfig(
@@ -110,6 +116,8 @@ def stop_ec2_instance(instance_id):
     Args:
         instance_id (str): The ID of the EC2 instance to stop.
     """
+    import boto3
+    from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
     try:
         # Create an EC2 client
         ec2_client = boto3.client('ec2', region_name='us-west-1')
@@ -137,21 +145,42 @@ def stop_ec2_instance(instance_id):
 
 
 
-if __name__ == "__main__":
-    run()
-
-    #   Combine CSV's
-    csv_files = glob.glob("*.csv")
-    excluded_csvs = ['articles.csv','simart.csv','test.csv','combined_data.csv']
-    dataframes = [pd.read_csv(file) for file in csv_files if file not in excluded_csvs and os.path.getsize(file) > 2] # Specify the scraped csv's + exclude the list
-    data = pd.concat(dataframes, ignore_index=True) if dataframes else pd.DataFrame()
+#=====
+#   Pipeline stages
+#       Each reads its inputs from / writes its outputs to stages.py, pipeline.py decides what needs to run.
+#       python main.py                          everything not already done today
+#       python main.py --from-stage cluster     cluster and everything after it
+#       python main.py --only-stage load_summaries
+#=====
+def stage_scrape():
+    import nlp_stream
+    #   Keywords/embeddings are worked out as rows come in (STREAM_NLP=0 to leave it all to the later stages)
+    stream = nlp_stream.NlpStream().start() if os.environ.get('STREAM_NLP', '1') == '1' else None
+    try:
+        #   SCRAPE_PROCESSES=1 runs every site in its own process
+        run(processes=os.environ.get('SCRAPE_PROCESSES') == '1', listener=stream.submit if stream else None)
+    finally:
+        if stream is not None:
+            stream.close()
+
+def stage_keywords():
+    import pandas as pd
+    import nlp_stream
+    import url_index
+    #   Scraped rows from every site
+    data = stages.get_dataframe('scraped')
 
     print("Pulled df")
     
-    #   Get Keywords
+    #   Get Keywords (mostly done already by the stream during scraping)
     data['Article Title'] = data['Article Title'].astype(str)
-    nlp,kw_model,common_keywords,weights = utils.init_keywords()
-    data['Keywords'] = data['Article Title'].apply(lambda title: utils.get_keywords(title, nlp, kw_model, common_keywords, weights))
+    #   Articles already stored still cluster with today's, but keep the keywords they were stored with
+    known_urls = url_index.get_index()
+    titles = data['Article Title'].tolist()
+    known = [url in known_urls for url in data['Article URL']]
+    fresh = iter(nlp_stream.keywords_for([t for t, k in zip(titles, known) if not k]))
+    stored = iter(nlp_stream.stored_keywords_for([t for t, k in zip(titles, known) if k]))
+    data['Keywords'] = pd.Series([next(stored) if k else next(fresh) for k in known], index=data.index, dtype=object)
     
 
     #   process data, create similar_articles_df, send to db
@@ -163,38 +192,35 @@ if __name__ == "__main__":
     # Convert to string format 'YYYY-MM-DD' for database insertion
     data['Date'] = data['Date'].dt.strftime('%Y-%m-%d')
 
+    stages.put('articles', data)
+
+def stage_cluster():
+    import nlp_stream
+    data = stages.get_dataframe('articles')
     cleaned_art_df = utils.remove_duplicates_article_rows(data)
-    similar_articles_df = utils.get_similar_articles(cleaned_art_df)
-    
-    #   Fix shitty chars
-    data['Keywords'] = data['Keywords'].fillna('').astype(str)
-    similar_articles_df['Keywords'] = similar_articles_df['Keywords'].fillna('').astype(str)
-    data['Keywords'] = data['Keywords'].apply(clean_text)
-    similar_articles_df['Keywords'] = similar_articles_df['Keywords'].apply(clean_text)
-
-    # Apply the safe_join function to the columns
-    similar_articles_df['Article Headlines'] = similar_articles_df['Article Headlines'].apply(safe_join)
-    similar_articles_df['Article URLs'] = similar_articles_df['Article URLs'].apply(safe_join)
-    similar_articles_df['Keywords'] = similar_articles_df['Keywords'].apply(safe_join)
-    
-    data.to_csv('articles.csv')
-    similar_articles_df.to_csv('simart.csv')
+    embeddings = nlp_stream.embeddings_for(cleaned_art_df['Article Title'].tolist())
+    similar_articles_df = utils.get_similar_articles(cleaned_art_df, embeddings)
+    stages.put('simart', similar_articles_df)
 
     print("Saved df's")
 
-    #data = pd.read_csv('articles.csv')
-    #similar_articles_df = pd.read_csv('simart.csv')
+def stage_load_db():
+    import url_index
+    #   Fix shitty chars, lists to text
+    data = articles_for_db(stages.get_dataframe('articles'))
+    similar_articles_df = simart_for_db(stages.get_dataframe('simart'))
 
     # upload to db
     print("Attempting db connection...")
     connection = utils.connect_db()
     print("connected to db")
 
-    # Change keywords from list to comma-separated string
-    data['Keywords'] = data['Keywords'].apply(lambda x: ','.join(x) if isinstance(x, list) else x)
-
     print('connected, inserting...')
+    #   Articles already stored are only here to cluster with today's
+    known_urls = url_index.get_index()
+    data = data[~data['Article URL'].map(known_urls.__contains__).astype(bool)]
     utils.insert_articles(connection, data)
+    known_urls.add_many(data['Article URL'])
     utils.insert_similar_articles(connection,similar_articles_df)
 
     print("Processing data via sql script...")
@@ -209,9 +235,13 @@ if __name__ == "__main__":
     connection.close()
     print("Data processing done")
 
+def stage_article_text():
+    import get_full_article
     #   get article text
     get_full_article.run_daily()
 
+def stage_summarize():
+    import pandas as pd
     #   Send text df to bucket for summarizing
     utils.send_to_bkt()
 
@@ -235,12 +265,39 @@ if __name__ == "__main__":
             print(f"Error waiting for completed status on 2nd instance: {e}")
 
         time.sleep(30)  # Check every 30 seconds
-    
+    stages.put('summaries', summary_df)
+
+def stage_load_summaries():
     #   2nd instance completed, sending data to database.
     connection = utils.connect_db()
-    utils.insert_summaries(connection,summary_df)
+    utils.insert_summaries(connection,stages.get_dataframe('summaries'))
     connection.close()
 
+def stage_stop_instance():
     #   Stop instance
     instance_id = "i-0ef94ad5baad81920"
     stop_ec2_instance(instance_id)
+
+STAGES = [
+    #   Scrape once per day, a rerun the same day picks up from the saved rows
+    pipeline.Stage('scrape', stage_scrape, outputs=['scraped'], key=lambda: date.today().isoformat()),
+    #   KEYWORD_MODE=fast / SPACY_SINGLE_PARSE=1 trade keyword quality for speed (see nlp_stream), switching reruns the stage
+    pipeline.Stage('keywords', stage_keywords, inputs=['scraped'], outputs=['articles'],
+                   key=lambda: os.environ.get('KEYWORD_MODE', 'full') + (':single_parse' if os.environ.get('SPACY_SINGLE_PARSE') == '1' else '')),
+    pipeline.Stage('cluster', stage_cluster, inputs=['articles'], outputs=['simart']),
+    pipeline.Stage('load_db', stage_load_db, inputs=['articles', 'simart']),
+    pipeline.Stage('article_text', stage_article_text, after=['load_db']),
+    pipeline.Stage('summarize', stage_summarize, outputs=['summaries'], after=['article_text']),
+    pipeline.Stage('load_summaries', stage_load_summaries, inputs=['summaries']),
+    pipeline.Stage('stop_instance', stage_stop_instance, after=['load_summaries'], always=True),
+]
+
+if __name__ == "__main__":
+    stage_names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Daily news pipeline")
+    entry = parser.add_mutually_exclusive_group()
+    entry.add_argument('--from-stage', choices=stage_names, help="Rerun this stage and everything after it")
+    entry.add_argument('--only-stage', choices=stage_names, help="Rerun just this stage")
+    args = parser.parse_args()
+
+    pipeline.run(STAGES, from_stage=args.from_stage, only_stage=args.only_stage)
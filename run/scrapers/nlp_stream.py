@@ -0,0 +1,159 @@
+#=======================================
+#    nlp_stream.py
+#        Keyword extraction and title embeddings while the scrapers are still running.
+#        Scraped rows go into a bounded queue (scrapers block if NLP falls too far behind), worker
+#        threads take them off and fill the caches below, keyed by title (keywords also go through the
+#        persistent keyword_cache, so most titles never reach spaCy/KeyBERT). The keyword and cluster
+#        stages then only compute what the stream didn't get to (e.g. rows resumed from a checkpoint),
+#        so the pipeline takes about max(scrape, NLP) instead of scrape + NLP.
+#=======================================
+
+import os
+import queue
+import threading
+
+import numpy as np
+
+import utils
+import url_index
+import keyword_cache as disk_cache
+
+QUEUE_BATCHES = 64      #   Row batches (about one section each) waiting for NLP before scrapers block
+WORKERS = 1             #   spaCy/torch already use several cores per call
+#   'full': spaCy + KeyBERT (utils.get_keywords_batch), 'fast': rules only (utils.get_keywords_fast)
+KEYWORD_MODE = os.environ.get('KEYWORD_MODE', 'full')
+#   Full mode only: spaCy worker processes, and parsing each title once instead of in both cases
+#       (faster, keywords differ a little, see utils.get_keywords_batch). Cached separately.
+SPACY_PROCESSES = int(os.environ.get('SPACY_PROCESSES', '1'))
+SPACY_SINGLE_PARSE = os.environ.get('SPACY_SINGLE_PARSE', '0') == '1'
+
+keyword_cache = {}      #   mode -> {title -> keywords}
+embedding_cache = {}    #   title -> embedding
+
+_models = None
+_sentence_model = None
+_models_lock = threading.Lock()
+
+def get_sentence_model():
+    global _sentence_model
+    with _models_lock:
+        if _sentence_model is None:
+            _sentence_model = utils.load_sentence_model()
+        return _sentence_model
+
+def get_models():
+    global _models
+    sentence_model = get_sentence_model()
+    with _models_lock:
+        if _models is None:
+            #   One SentenceTransformer for KeyBERT and clustering, titles are only embedded once
+            nlp, kw_model, common_keywords, weights = utils.init_keywords(sentence_model)
+            _models = {
+                'nlp': nlp, 'kw_model': kw_model, 'common_keywords': common_keywords, 'weights': weights,
+                'sentence_model': sentence_model,
+            }
+        return _models
+
+def extract(titles, mode):
+    if mode == 'fast':
+        matcher = utils.KeywordMatcher(utils.COMMON_KEYWORDS)
+        return [utils.get_keywords_fast(t, matcher, utils.WEIGHTS) for t in titles]
+    m = get_models()
+    #   Same embeddings the cluster stage uses
+    embeddings = embeddings_for(titles)
+    return utils.get_keywords_batch(titles, m['nlp'], m['kw_model'], m['common_keywords'], m['weights'],
+                                    n_process=SPACY_PROCESSES, single_parse=SPACY_SINGLE_PARSE,
+                                    doc_embeddings=embeddings)
+
+def _disk_cache(mode):
+    return disk_cache.get_cache(mode, single_parse=mode == 'full' and SPACY_SINGLE_PARSE)
+
+#===================================================================================
+#   Cached lookups (computing whatever is missing)
+#===================================================================================
+def keywords_for(titles, mode=None):
+    mode = mode or KEYWORD_MODE
+    cache = keyword_cache.setdefault(mode, {})
+    missing = [t for t in dict.fromkeys(titles) if t not in cache]
+    #   Seen on an earlier day / run
+    if missing:
+        stored = _disk_cache(mode).get_many(missing)
+        cache.update(stored)
+        missing = [t for t in missing if t not in stored]
+    if missing:
+        found = extract(missing, mode)
+        cache.update(zip(missing, found))
+        _disk_cache(mode).put_many(dict(zip(missing, found)))
+    return [cache[t] for t in titles]
+
+#   Articles already in the database (url_index): keywords from the caches only (this mode's, then the
+#       ones warmed from the database), never extracted again.
+#       They still go through clustering with today's articles. Titles with nothing cached get no keywords.
+def stored_keywords_for(titles, mode=None):
+    mode = mode or KEYWORD_MODE
+    cache = keyword_cache.setdefault(mode, {})
+    found = {t: cache[t] for t in dict.fromkeys(titles) if t in cache}
+    missing = [t for t in dict.fromkeys(titles) if t not in found]
+    if missing:
+        found.update(_disk_cache(mode).get_many(missing))
+        missing = [t for t in missing if t not in found]
+    #   Then the keywords they were stored with
+    if missing:
+        found.update(disk_cache.get_cache(disk_cache.DB_MODE).get_many(missing))
+    return [found.get(t, []) for t in titles]
+
+def embeddings_for(titles):
+    missing = [t for t in dict.fromkeys(titles) if t not in embedding_cache]
+    if missing:
+        for title, vector in zip(missing, get_sentence_model().encode(missing)):
+            embedding_cache[title] = vector
+    return np.array([embedding_cache[t] for t in titles])
+
+#===================================================================================
+#   Stream
+#===================================================================================
+class NlpStream:
+    def __init__(self, workers=WORKERS, maxsize=QUEUE_BATCHES):
+        self.queue = queue.Queue(maxsize)
+        self.workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        self.error = None
+        self.processed = 0
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def _work(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            if self.error is not None:
+                continue
+            titles, fresh = batch
+            try:
+                keywords_for(fresh)
+                embeddings_for(titles)
+                self.processed += len(titles)
+            except Exception as e:
+                #   Keep draining so scrapers never block on a dead consumer, the stages catch up later
+                print(f"NLP stream failed, keywords will be computed after scraping: {e}")
+                self.error = e
+
+    #   DataCollector listener: called from scraper threads with each batch of new rows
+    def submit(self, rows):
+        if self.error is None:
+            known_urls = url_index.get_index()
+            titles = [str(row.get('Article Title')) for row in rows]
+            #   Stored articles are only embedded (for clustering), their keywords come from the caches
+            fresh = [t for t, row in zip(titles, rows) if row.get('Article URL') not in known_urls]
+            self.queue.put((titles, fresh))
+
+    def close(self):
+        #   Wait for everything queued so far
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        print(f"NLP stream: {self.processed} titles processed while scraping")
@@ -0,0 +1,146 @@
+#=======================================
+#    pipeline.py
+#        Small DAG runner for the daily pipeline.
+#        Each stage declares the stage outputs it reads (inputs) and writes (outputs, see stages.py),
+#        and/or plain ordering dependencies on other stages (after). A stage is skipped when it already
+#        completed with the same input hashes and its outputs are still on disk, so a failure late in
+#        the day (summaries) reruns only what's left instead of re-scraping.
+#
+#        Checkpoint state lives in stages/_state.json:
+#            {stage: {"key": <hash of inputs>, "outputs": {output: <hash of its parquet file>}}}
+#=======================================
+
+import os
+import json
+import hashlib
+
+import stages
+
+STATE_PATH = os.path.join(stages.STAGE_DIR, '_state.json')
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=(), after=(), key=None, always=False):
+        """
+        Args:
+            func (callable): Runs the stage, reads inputs with stages.get() and writes outputs with stages.put().
+            inputs (tuple): Stage outputs this stage reads.
+            outputs (tuple): Stage outputs this stage writes.
+            after (tuple): Stages that must have run first (side effects only, e.g. a db load).
+            key (callable): Extra value mixed into the input hash, e.g. today's date for the scrape.
+            always (bool): Never skipped, e.g. shutting the instance down at the end of a run.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.after = tuple(after)
+        self.key = key
+        self.always = always
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_state(state):
+    os.makedirs(stages.STAGE_DIR, exist_ok=True)
+    with open(STATE_PATH + '.tmp', 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(STATE_PATH + '.tmp', STATE_PATH)
+
+#   Stages in dependency order. Declaration order breaks ties.
+def ordered(stage_list):
+    producers = {out: s.name for s in stage_list for out in s.outputs}
+    by_name = {s.name: s for s in stage_list}
+    order, visiting, done = [], set(), set()
+    def visit(stage):
+        if stage.name in done:
+            return
+        if stage.name in visiting:
+            raise ValueError(f"Pipeline cycle at stage '{stage.name}'")
+        visiting.add(stage.name)
+        for dep in [producers[i] for i in stage.inputs if i in producers] + list(stage.after):
+            visit(by_name[dep])
+        visiting.discard(stage.name)
+        done.add(stage.name)
+        order.append(stage)
+    for stage in stage_list:
+        visit(stage)
+    return order
+
+def input_key(stage, state):
+    #   Hash of everything the stage depends on: input files, upstream stage keys, the stage's own key
+    digest = hashlib.sha256(stage.name.encode())
+    for name in stage.inputs:
+        path = stages.path_for(name)
+        digest.update(f"{name}={file_hash(path) if os.path.exists(path) else 'missing'}".encode())
+    for dep in stage.after:
+        digest.update(f"{dep}={state.get(dep, {}).get('key', 'missing')}".encode())
+    if stage.key is not None:
+        digest.update(str(stage.key()).encode())
+    return digest.hexdigest()
+
+def up_to_date(stage, state, key):
+    done = state.get(stage.name)
+    if done is None or done.get('key') != key:
+        return False
+    for name in stage.outputs:
+        path = stages.path_for(name)
+        if not os.path.exists(path) or file_hash(path) != done['outputs'].get(name):
+            return False
+    return True
+
+def downstream(stage_list, name):
+    #   The stage and everything that (transitively) depends on it
+    names = {name}
+    for stage in ordered(stage_list):
+        deps = set(stage.after) | {s.name for s in stage_list if set(s.outputs) & set(stage.inputs)}
+        if deps & names:
+            names.add(stage.name)
+    return names
+
+def run(stage_list, from_stage=None, only_stage=None):
+    """
+    Run the pipeline, skipping stages that are up to date.
+
+    Args:
+        from_stage (str): Force this stage and everything downstream of it to run.
+            Stages upstream of it are never run, their outputs must already be on disk.
+        only_stage (str): Force just this stage, reading its inputs from disk.
+    """
+    names = [s.name for s in stage_list]
+    for requested in (from_stage, only_stage):
+        if requested is not None and requested not in names:
+            raise ValueError(f"Unknown stage '{requested}', stages are: {', '.join(names)}")
+
+    state = load_state()
+    forced = set()
+    if from_stage is not None:
+        forced = downstream(stage_list, from_stage)
+    elif only_stage is not None:
+        forced = {only_stage}
+
+    for stage in ordered(stage_list):
+        if (from_stage is not None or only_stage is not None) and stage.name not in forced:
+            continue
+        key = input_key(stage, state)
+        if stage.name not in forced and not stage.always and up_to_date(stage, state, key):
+            print(f"[{stage.name}] up to date, skipping")
+            continue
+        print(f"[{stage.name}] running")
+        stage.func()
+        state[stage.name] = {
+            'key': key,
+            'outputs': {name: file_hash(stages.path_for(name)) for name in stage.outputs},
+        }
+        save_state(state)
+    return state
@@ -1,66 +1,41 @@
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
 from selenium.common.exceptions import StaleElementReferenceException
-from selenium.webdriver.firefox.service import Service
 
-import requests
-from bs4 import BeautifulSoup
-
-import time
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 import re
-import pandas as pd
 import warnings
 warnings.filterwarnings("ignore")
 
+import driver_pool
+import static_scrape
+import extract
+import scroll_harvest
+import waits
+import url_index
+import images
+
+#   Longest a scroll loop may spend on one section page
+SECTION_TIMEOUT = 90
+
 #===================================================================================
 #   Helper Functions
 #===================================================================================
-def get_element_with_retry(driver,by,thing):
-    i = 0
-    while i < 100:
-        try:
-            element = driver.find_element(by,thing)
-            break
-        except:
-            driver.execute_script("arguments[0].scrollTop += 50;", driver)
-    return element
-
+#   Bounded: 10 tries with backoff, scrolling the container a bit between tries
+def get_element_with_retry(driver,by,thing,attempts=10,timeout=5):
+    return waits.retry(
+        lambda: driver.find_element(by,thing),
+        attempts=attempts,
+        timeout=timeout,
+        on_retry=lambda: getattr(driver, 'parent', driver).execute_script("arguments[0].scrollTop += 50;", driver)
+    )
+
+#   Single row version of images.resolve_images (cached, reads only <head> when og:image is there)
 def get_img(row):
-    url = row['Article URL']
-    source = row['Source']
-    if source == 'FOX':
-        # Send a GET request to the URL
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        # Find all image tags
-        images = soup.find_all('img')
-        
-        # Loop through images and filter out ones starting with 'https://static.'
-        for img in images[1:]:  # Skipping the first image (if necessary)
-            image_url = img.get('src')
-            if image_url and not image_url.startswith('https://static.'):
-                return image_url
-
-        # Return None if no valid image is found
-        return None
-    
-    elif source == 'CNN':
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content,'html.parser')
-
-        images = soup.find_all('img')
-        for img in images:
-            image_url = img.get('src')
-            if image_url and not 'face' in image_url and image_url.startswith('https://'):
-                return image_url
-        return None
+    return images.resolve_image(row['Article URL'], row['Source'])
 
 def safe_join(value):
     if isinstance(value, list):
@@ -78,7 +53,7 @@ def clean_text(text):
 
 def fox_popup_close(driver):
     try:
-        WebDriverWait(driver, 10).until(EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, 'iframe[title="Modal Message"]')))
+        waits.wait_for(driver, EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, 'iframe[title="Modal Message"]')), timeout=10)
     except:
         pass
     try:
@@ -90,11 +65,18 @@ def fox_popup_close(driver):
 
 def wapo_popup(driver):
     try:
-        time.sleep(2)
-        driver.find_element(By.CSS_SELECTOR,'[data-qa="close-button-container"]').click()
+        waits.wait_for(driver, waits.element_clickable(By.CSS_SELECTOR,'[data-qa="close-button-container"]'), timeout=2).click()
     except:
         return
 
+#   Check for popup and close
+def nyt_popup_close(driver):
+    try:
+        button = driver.find_element(By.XPATH,"//div[@role='alertdialog']//button")
+        button.click()
+    except:
+        pass
+
 def Find_if_available(driver,by,val):
     try:
         ele = driver.find_element(by,val)
@@ -178,6 +160,68 @@ def clean_nyt_date(raw_date):
     
     return date
 
+#===================================================================================
+#   Section jobs
+#       Every site finds its sections first, then each section runs as its own job on a
+#       bounded per-site pool. Jobs lease their own browser from driver_pool (the pool still
+#       caps browsers overall), return their rows, and rows merge into the site's collector
+#       in section order, deduplicated by URL. Urls already in url_index are kept (stories still on the
+#       section pages cluster with today's coverage) but get no image lookup, keyword extraction or db insert.
+#       Each section's new rows still missing an image are resolved together (images.resolve_images)
+#       while later sections keep scraping, then go into the collector and the section is flushed
+#       (checkpoint to parquet, or streamed to the parent in process mode).
+#===================================================================================
+class SectionsFailed(Exception):
+    """Every section of a site failed."""
+    def __init__(self, source, errors):
+        self.source = source
+        self.errors = errors        #   section -> exception
+        first = next(iter(errors.values()))
+        super().__init__(f"{source}: all {len(errors)} section(s) failed, first error: {first!r}")
+
+#   Max sections scraped at once, per site
+SECTION_WORKERS = {
+    'FOX': 3,
+    'CNN': 3,
+    'WAPO': 2,      # Paywall modal gets aggressive with many sessions
+    'NYT': 4,
+    'AP': 3,
+    'NPR': 4,
+    'HuffPost': 3,
+    'CBS': 4,
+}
+
+def run_sections(collector, source, section_dict, section_job):
+    known_urls = url_index.get_index()
+    #   Resuming from a checkpoint: sections already on disk are skipped
+    section_dict = {s: u for s, u in section_dict.items() if not collector.section_done(s)}
+    #   Section threads lease browsers on behalf of the same owner (site) so a supervisor can cancel them
+    owner = driver_pool.current_owner()
+    def owned_job(section, section_url):
+        with driver_pool.owned_by(owner):
+            return section_job(section, section_url)
+    failed = {}
+    with ThreadPoolExecutor(max_workers=SECTION_WORKERS.get(source, 2)) as executor:
+        futures = [(s, executor.submit(owned_job, s, section_dict[s])) for s in section_dict]
+        for s, future in futures:
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"{source} section '{s}' failed: {e}")
+                failed[s] = e
+                continue
+            rows = collector.unseen(rows)
+            #   Images first: the collector copies each row's values when it takes the row.
+            #       Stored articles only come along for clustering, they don't need one.
+            images.resolve_images([r for r in rows if r['Article URL'] not in known_urls])
+            collector.extend_data(rows)
+            collector.flush(section=s)
+    #   Nothing worked (layout change, blocked): the site failed, so the supervisor keeps its checkpoint
+    #       and the circuit breaker counts it. A few bad sections alone don't fail the site.
+    if failed and len(failed) == len(section_dict):
+        raise SectionsFailed(source, failed)
+    return True
+
 #===================================================================================
 #   News Site Scraping
 #===================================================================================
@@ -186,105 +230,67 @@ def clean_nyt_date(raw_date):
 def foxnews(collector):
     url = 'https://www.foxnews.com/'
 
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.fullscreen_window()
-    driver.get(url)
-    try:
-        driver.find_element(By.CLASS_NAME,'js-menu-toggle').click()
-    except:
-        fox_popup_close(driver)
-        driver.switch_to.default_content()
-        time.sleep(2)
-        driver.find_element(By.CLASS_NAME,'js-menu-toggle').click()
-
-    # Get Sectors
-    sector_dict = {}
-    sectors = driver.find_elements(By.CLASS_NAME,'nav-title') 
-    for i in sectors:
-        sector = i.find_element(By.TAG_NAME,'a').get_attribute('aria-label')
-        sector_url = i.find_element(By.TAG_NAME,'a').get_attribute('href')
-        if sector not in sector_dict:
-            sector_dict[sector] = sector_url
-        else:
-            break
-    
-    # Collect all data in a list
-    all_data = []
+    with driver_pool.driver() as driver:
+        driver.get(url)
+        try:
+            driver.find_element(By.CLASS_NAME,'js-menu-toggle').click()
+        except:
+            fox_popup_close(driver)
+            driver.switch_to.default_content()
+            waits.wait_for(driver, waits.element_clickable(By.CLASS_NAME,'js-menu-toggle'), timeout=5).click()
+
+        # Get Sectors
+        sector_dict = {}
+        sectors = driver.find_elements(By.CLASS_NAME,'nav-title') 
+        for i in sectors:
+            sector = i.find_element(By.TAG_NAME,'a').get_attribute('aria-label')
+            sector_url = i.find_element(By.TAG_NAME,'a').get_attribute('href')
+            if sector not in sector_dict:
+                sector_dict[sector] = sector_url
+            else:
+                break
 
     # Into Sector Dicts
-    for s in sector_dict:
-        driver.get(sector_dict[s])
+    return run_sections(collector, 'FOX', sector_dict, fox_section)
 
-        # Scroll to load more articles
-        for i in range(8):
-            driver.execute_script("window.scrollTo(0, window.pageYOffset + 700);")
-            time.sleep(0.3)
+def fox_section(s, section_url):
+    all_data = []
+    known_urls = url_index.get_index()
+    with driver_pool.driver() as driver:
+        driver.get(section_url)
 
-        # Extract article data
-        for ele in driver.find_elements(By.TAG_NAME,'article'):
-            url = ele.find_element(By.TAG_NAME,'a').get_attribute('href')
-            try:
-                txtloc = ele.find_elements(By.TAG_NAME,'a')
-                text = txtloc[2].text
-            except:
-                for i in txtloc:
-                    if i.text == '':
-                        continue
-                    text = i.text
-                    break
-            # Try/Catch for url is null
+        # Scroll to load more articles, reading only the ones each scroll adds (max 8 scrolls, or until only known articles show up)
+        for rec in scroll_harvest.harvest(driver, 'FOX', step=700, max_steps=8, known_urls=known_urls):
+            url = rec['url']
+            text = rec['title']
+            # Skip if url/title is null
             # Ignore video pulls, along with these dumb 'quiz' things.
-            try:
-                if url.startswith('https://www.foxnews.com/video') or 'quiz' in text.lower() or 'political cartoons of the day' in text.lower():
-                    continue
-            except:
+            if not url or text is None:
+                continue
+            if url.startswith('https://www.foxnews.com/video') or 'quiz' in text.lower() or 'political cartoons of the day' in text.lower():
                 continue
-
-            try:
-                img = ele.find_element(By.TAG_NAME,'img').get_attribute('src')
-            except:
-                row_data = {
-                    'Source': 'FOX',
-                    'Section': s,
-                    'Section URL': sector_dict[s],
-                    'Article Title': text,
-                    'Article URL': url,
-                    'Date': date,
-                }
-                try:
-                    img = get_img(row_data)
-                except:
-                    img = None
 
             # Get date
             try:
-                raw_date = ele.find_element(By.CLASS_NAME, 'time').text
-                date = clean_fox_date(raw_date)
+                date = clean_fox_date(rec['date'])
             except:
                 date = datetime.today().strftime('%Y-%m-%d')
             
             # Collect the row data in a dictionary
+            #   No inline image -> left as None, run_sections resolves those in one batch
             row_data = {
                 'Source': 'FOX',
                 'Section': s,
-                'Section URL': sector_dict[s],
+                'Section URL': section_url,
                 'Article Title': text,
                 'Article URL': url,
                 'Date': date,
-                'Image': img,
+                'Image': rec['image'],
                 'Subheading': None
             }
             all_data.append(row_data)
 
-    driver.quit()
-
-    # Append all data at once to the DataFrame
-    for row in all_data:
-        collector.append_data(row)
-    
-    return True
+    return all_data
 
 #===================================================================================
 #       CNN
@@ -292,47 +298,35 @@ def foxnews(collector):
 def cnn(collector):
     url = 'https://www.cnn.com/'
 
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.fullscreen_window()
-    driver.get(url)
-
-    driver.find_element(By.CLASS_NAME, 'header__menu-icon-svg').click()
-    
-
-    # Get Sectors
-    sector_dict = {}
-    sectors = driver.find_elements(By.CLASS_NAME, 'subnav__section-link')
-    for i in sectors:
-        sector = i.text
-        sector_url = i.get_attribute('href')
-        if 'about' in sector.lower():
-            break
-        sector_dict[sector] = sector_url
+    with driver_pool.driver() as driver:
+        driver.get(url)
 
-    driver.quit()
+        driver.find_element(By.CLASS_NAME, 'header__menu-icon-svg').click()
+        
 
-    # Collect all data in a list
-    all_data = []
+        # Get Sectors
+        sector_dict = {}
+        sectors = driver.find_elements(By.CLASS_NAME, 'subnav__section-link')
+        for i in sectors:
+            sector = i.text
+            sector_url = i.get_attribute('href')
+            if 'about' in sector.lower():
+                break
+            sector_dict[sector] = sector_url
 
     # Into Sector Dicts
-    for s in sector_dict:
-        options = Options()
-        options.add_argument('-headless')
-        driver = webdriver.Firefox(options=options)
-        driver.fullscreen_window()
-        driver.get(sector_dict[s])
+    return run_sections(collector, 'CNN', sector_dict, cnn_section)
 
-        # Scroll to load more articles
-        for i in range(8):
-            driver.execute_script("window.scrollTo(0, window.pageYOffset + 700);")
-            time.sleep(0.3)
+def cnn_section(s, section_url):
+    all_data = []
+    known_urls = url_index.get_index()
+    with driver_pool.driver() as driver:
+        driver.get(section_url)
 
-        # Extract article data
-        for ele in driver.find_elements(By.XPATH, '//a[@href]'):
-            text = ele.text
-            url = ele.get_attribute('href')
+        # Scroll to load more articles, reading only the ones each scroll adds (max 8 scrolls, or until only known articles show up)
+        for rec in scroll_harvest.harvest(driver, 'CNN', step=700, max_steps=8, known_urls=known_urls):
+            text = rec['title'] or ''
+            url = rec['url'] or ''
 
             # Filter out unwanted URLs and titles
             if len(text) < 10 or url.count('-') < 3 or text.count(' ') < 2 or url in ['', ' '] or 'cnn.com/audio' in url:
@@ -342,30 +336,21 @@ def cnn(collector):
             date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
             # Collect the row data in a dictionary
+            #   Image is pulled from the article page later, run_sections resolves them in one batch
             row_data = {
                 'Source': 'CNN',
                 'Section': s,
-                'Section URL': sector_dict[s],
+                'Section URL': section_url,
                 'Article Title': text,
                 'Article URL': url,
                 'Date': date,
+                'Image': None,
                 'Subheading': None
             }
-            try:
-                img = get_img(row_data)
-            except:
-                img = None
-            row_data['Image'] = img
 
             all_data.append(row_data)
 
-        driver.quit()
-
-    # Append all data at once to the DataFrame
-    for row in all_data:
-        collector.append_data(row)
-
-    return True
+    return all_data
 
 #===================================================================================
 #       WAPO
@@ -373,83 +358,68 @@ def cnn(collector):
 def wapo(collector):
     url = 'https://www.washingtonpost.com'
 
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.fullscreen_window()
-    driver.get(url)
-    wapo_popup(driver)
-    driver.find_element(By.XPATH, '//*[@data-testid="sc-header-sections-menu-button"]').click()
+    with driver_pool.driver() as driver:
+        driver.get(url)
+        wapo_popup(driver)
+        driver.find_element(By.XPATH, '//*[@data-testid="sc-header-sections-menu-button"]').click()
     
-    sec = driver.find_element(By.ID, 'sc-sections-nav-drawer')
-    l = sec.find_elements(By.XPATH, "//*[starts-with(@id, '/')]")
+        sec = driver.find_element(By.ID, 'sc-sections-nav-drawer')
+        l = sec.find_elements(By.XPATH, "//*[starts-with(@id, '/')]")
     
-    sector_dict = {}
-    actions = ActionChains(driver)
+        sector_dict = {}
+        actions = ActionChains(driver)
 
-    # Collecting sector URLs
-    for i in l:
-        try:
-            dropdown_trigger = i.find_element(By.TAG_NAME, 'div')
-            actions.move_to_element(dropdown_trigger).perform()  # Hover over the element to trigger the dropdown
+        # Collecting sector URLs
+        for i in l:
+            try:
+                dropdown_trigger = i.find_element(By.TAG_NAME, 'div')
+                actions.move_to_element(dropdown_trigger).perform()  # Hover over the element to trigger the dropdown
             
-            test = driver.find_elements(By.TAG_NAME, 'ul')
-            t = test[len(test) - 1].find_elements(By.TAG_NAME, 'li')
+                test = driver.find_elements(By.TAG_NAME, 'ul')
+                t = test[len(test) - 1].find_elements(By.TAG_NAME, 'li')
             
-            for j in t:
-                try:
-                    # Use a retry mechanism to handle stale elements
-                    sector_url = get_element_with_retry(j, By.TAG_NAME, 'a').get_attribute('href')
-                    txt = j.find_element(By.TAG_NAME, 'a').text
-                    main = i.find_element(By.TAG_NAME, 'a').text.replace("+", " ")
-                    subcat = f"{main}/{txt}"
-                    sector_dict[subcat] = sector_url
-                except StaleElementReferenceException:
-                    print("Stale element detected.")
-
-            driver.execute_script("arguments[0].scrollTop += 85;", sec)
-        except:
-            driver.execute_script("arguments[0].scrollTop += 85;", sec)
+                for j in t:
+                    try:
+                        # Use a retry mechanism to handle stale elements
+                        sector_url = get_element_with_retry(j, By.TAG_NAME, 'a').get_attribute('href')
+                        txt = j.find_element(By.TAG_NAME, 'a').text
+                        main = i.find_element(By.TAG_NAME, 'a').text.replace("+", " ")
+                        subcat = f"{main}/{txt}"
+                        sector_dict[subcat] = sector_url
+                    except StaleElementReferenceException:
+                        print("Stale element detected.")
+
+                driver.execute_script("arguments[0].scrollTop += 85;", sec)
+            except:
+                driver.execute_script("arguments[0].scrollTop += 85;", sec)
 
-    # Collect all data in a list
-    all_data = []
     # Navigate into each sector and collect articles
-    for s in sector_dict:
-        driver.get(sector_dict[s])
+    return run_sections(collector, 'WAPO', sector_dict, wapo_section)
 
-        for i in range(8):
-            driver.execute_script("window.scrollTo(0, window.pageYOffset + 700);")
-            time.sleep(0.3)
+def wapo_section(s, section_url):
+    all_data = []
+    with driver_pool.driver() as driver:
+        driver.get(section_url)
 
-        # Re-fetch elements after scrolling
-        elements = driver.find_elements(By.CSS_SELECTOR, '[data-feature-id="homepage/story"]')
-        for ele in elements:
-            try:
-                text = ele.find_element(By.CSS_SELECTOR,'[data-qa="card-title"]').text.replace("\n", '')
-                article_url = ele.find_element(By.TAG_NAME, 'a').get_attribute('href')
-                if not text or len(text) < 3:
-                    continue
-            except:
+        # Scroll to load more articles, reading only the ones each scroll adds (max 8 scrolls, or until only known articles show up)
+        for rec in scroll_harvest.harvest(driver, 'WAPO', step=700, max_steps=8, known_urls=url_index.get_index()):
+            text = (rec['title'] or '').replace("\n", '')
+            article_url = rec['url']
+            if not text or len(text) < 3 or not article_url:
                 continue
 
             if len(text) < 3 or article_url.count('-') < 3 or text.count(' ') < 3 or len(article_url) < 5:
                 continue
 
             date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            #   Get image and subheading (if available)
-            try:
-                image = ele.find_element(By.TAG_NAME,'img').get_attribute('src')
-            except:
-                image = None
-            try:
-                subheading = ele.find_element(By.TAG_NAME,'p').text
-            except:
-                subheading = None
+            #   Image and subheading (if available)
+            image = rec['image']
+            subheading = rec['subheading']
 
             row_data = {
                 'Source': 'WAPO',
                 'Section': s,
-                'Section URL': sector_dict[s],
+                'Section URL': section_url,
                 'Article Title': text,
                 'Article URL': article_url,
                 'Date': date,
@@ -458,227 +428,181 @@ def wapo(collector):
             }
             all_data.append(row_data)
 
-    driver.quit()
-
-    # Append all data at once to the DataFrame
-    for row in all_data:
-        collector.append_data(row)
-
-    return True
+    return all_data
 #===================================================================================
 #       NYT
 #===================================================================================
 def nyt(collector):
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.fullscreen_window()
-    driver.get('https://www.nytimes.com/')
+    with driver_pool.driver() as driver:
+        driver.get('https://www.nytimes.com/')
+
+        # Collect section URLs
+        t = driver.find_elements(By.CSS_SELECTOR, '[data-testid^="nav-item-"]')
+        sector_dict = {}
+        for i in t:
+            ele = i.find_element(By.TAG_NAME, 'a')
+            url = ele.get_attribute('href')
+            text = ele.text
+            if 'nytimes.com/spotlight/' in url or text in ['', ' ', 'Games', 'Wirecutter', 'Cooking','Athletic']:
+                continue
+            sector_dict[text] = url
 
-    all_data = []
-    viewport_height = driver.execute_script("return window.innerHeight;")
-
-    # Collect section URLs
-    t = driver.find_elements(By.CSS_SELECTOR, '[data-testid^="nav-item-"]')
-    sector_dict = {}
-    for i in t:
-        ele = i.find_element(By.TAG_NAME, 'a')
-        url = ele.get_attribute('href')
-        text = ele.text
-        if 'nytimes.com/spotlight/' in url or text in ['', ' ', 'Games', 'Wirecutter', 'Cooking','Athletic']:
-            continue
-        sector_dict[text] = url
+    # Iterate through sectors (urls repeated across sectors are dropped by the collector)
+    return run_sections(collector, 'NYT', sector_dict, nyt_section)
 
+def nyt_section(s, section_url):
+    all_data = []
     visited_urls = set()
-    # Iterate through sectors
-    for s in sector_dict:
-        driver.get(sector_dict[s])
-
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            #   Check for popup and close
+    with driver_pool.driver() as driver:
+        driver.get(section_url)
+        viewport_height = driver.execute_script("return window.innerHeight;")
+
+        #   Only new articles are read on each scroll. Stops when a scroll adds nothing or only articles we already have,
+        #       or at an arb. 20k limit (infinite scroll, seems like ~3 days worth in high pop sections)
+        for rec in scroll_harvest.harvest(driver, 'NYT', step=viewport_height, max_height=20000, known_urls=url_index.get_index(), before_step=nyt_popup_close):
+            url = rec['url']
+            title = rec['title']
+            if url is None or title is None:
+                continue
+            if url in visited_urls or title.count(' ') <= 2:
+                continue
+            visited_urls.add(url)
             try:
-                button = driver.find_element(By.XPATH,"//div[@role='alertdialog']//button")
-                button.click()
+                date = clean_nyt_date(rec['date'])
             except:
-                pass
-            
-            #   Into visible articles
-            article_reg = driver.find_elements(By.TAG_NAME,'article')
-            for a in article_reg:
-                b = a.find_element(By.TAG_NAME,'a')
-                url = b.get_attribute('href')
-                title = b.text
-                if url in visited_urls or title.count(' ') <= 2:
-                    continue
-                visited_urls.add(url)
-                try:
-                    subheader = a.find_element(By.TAG_NAME,'p').text
-                except:
-                    subheader = None
-                try:
-                    img = a.find_element(By.TAG_NAME,'img').get_attribute('src')
-                except:
-                    img = None
-                try:
-                    parent = driver.execute_script("return arguments[0].parentNode;", a)
-                    date = parent.find_element(By.CSS_SELECTOR, '[data-testid="todays-date"]').text
-                    date = clean_nyt_date(date)
-                except:
-                    date = datetime.today().strftime('%Y-%m-%d')
+                date = datetime.today().strftime('%Y-%m-%d')
                 
-                row_data = {
-                    'Source': 'NYT',
-                    'Section': s,
-                    'Section URL': sector_dict[s],
-                    'Article Title': title,
-                    'Article URL': url,
-                    'Date': date,
-                    'Image': img,
-                    'Subheading': subheader
-                }
-                all_data.append(row_data)
-
-            driver.execute_script(f"window.scrollBy(0, {viewport_height});")
-            new_height = driver.execute_script("return window.scrollY;")
-
-            if last_height == new_height or new_height >= 20000:    #   Set an arb. 20k limit on scroll. (infinite scroll, seems like ~3 days worth in high pop sections)
-                break
-            last_height = new_height
-
-    driver.quit()
-    # Append all data at once to the DataFrame
-    for row in all_data:
-        collector.append_data(row)
+            row_data = {
+                'Source': 'NYT',
+                'Section': s,
+                'Section URL': section_url,
+                'Article Title': title,
+                'Article URL': url,
+                'Date': date,
+                'Image': rec['image'],
+                'Subheading': rec['subheading']
+            }
+            all_data.append(row_data)
 
-    return True
+    return all_data
 #===================================================================================
 #       AP News
 #===================================================================================
 def ap(collector):
-    all_data = []
-
     #   Get Sections
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.get('https://apnews.com/')
-    driver.fullscreen_window()
-
-    #       Get Sections
-    sector_dict = {}
-
-    #   Sect dropdown
-    driver.find_element(By.CSS_SELECTOR,'.Page-header-menu-trigger.desktop-icon').click()
-    t = driver.find_elements(By.CLASS_NAME,'AnClick-Hamburger-NavItem')
-    for i in t:
-        sector_dict[i.text] = i.get_attribute('href')
-        if 'religion' in i.text.lower():
-            break
+    with driver_pool.driver() as driver:
+        driver.get('https://apnews.com/')
+
+        #       Get Sections
+        sector_dict = {}
+
+        #   Sect dropdown
+        driver.find_element(By.CSS_SELECTOR,'.Page-header-menu-trigger.desktop-icon').click()
+        t = driver.find_elements(By.CLASS_NAME,'AnClick-Hamburger-NavItem')
+        for i in t:
+            sector_dict[i.text] = i.get_attribute('href')
+            if 'religion' in i.text.lower():
+                break
 
     #   Get Articles
-    collected_urls = set() #Set of urls to check for duplicates. Approach to scrolling is pulling lots of duplicates
-    for sect in sector_dict:
-        section = sect
-        section_url = sector_dict[sect]
-        
+    #       Scrolling pulls lots of duplicates, the collector drops repeated urls
+    return run_sections(collector, 'AP', sector_dict, ap_section)
+
+def ap_section(sect, section_url):
+    #   Server-rendered, try plain HTTP before the browser
+    rows = static_scrape.scrape_section('AP', sect, section_url)
+    if rows:
+        return rows
+
+    all_data = []
+    collected_urls = set()
+    with driver_pool.driver() as driver:
         # Get items from page
         driver.get(section_url)
         driver.fullscreen_window()
         #   Check for popup,close
-        wait = WebDriverWait(driver, 5)
         try:
-            e = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, ".bcpNotificationBarClose.bcpNotificationBarCloseIcon.bcpNotificationBarCloseTopRight")))
+            e = waits.wait_for(driver, waits.element_visible(By.CSS_SELECTOR, ".bcpNotificationBarClose.bcpNotificationBarCloseIcon.bcpNotificationBarCloseTopRight"), timeout=5)
             e.click()
         except:
             pass
         
         last_height = driver.execute_script("return document.body.scrollHeight")
         end_of_page_checker = 0
-        while end_of_page_checker < 3:
-            item_segments = driver.find_elements(By.CLASS_NAME,'PageList-items')
-            for segment in range(len(item_segments)):
-                #   Skip first 2 segments; it's just the header section
-                if segment == 0 or segment == 1:
+        deadline = waits.Deadline(SECTION_TIMEOUT)
+        while end_of_page_checker < 3 and not deadline.expired():
+            #   One round trip for every item on the page (header segments skipped in the snippet)
+            for rec in extract.extract_records(driver, 'AP'):
+                img = rec['image']
+                header = rec['title']
+                url = rec['url']
+                #   If no titles or link, skip dat shit
+                if header is None or url is None:
                     continue
-                seg = item_segments[segment]
-                items = seg.find_elements(By.CLASS_NAME,'PageList-items-item')
-                for i in items:
-                    img = Find_if_available(i,By.TAG_NAME,'source')
-                    img = img.get_attribute('srcset') if img is not None else None
-                    #   If no titles or link, skip dat shit
-                    try:
-                        titles = i.find_elements(By.CLASS_NAME,'PagePromoContentIcons-text')
-                        header = titles[0].text
-                        url = i.find_element(By.TAG_NAME,'a').get_attribute('href')
-                    except:
-                        continue
-                    #   Subheader if available
-                    try:
-                        subheader = titles[1].text
-                    except:
-                        subheader = None
-                    if subheader != None and subheader.replace(' ','') == '':
-                        subheader = None
+                #   Subheader if available
+                subheader = rec['subheading']
+                if subheader != None and subheader.replace(' ','') == '':
+                    subheader = None
 
-                    if header.replace(' ','') == '': # empty title
-                        continue
+                if header.replace(' ','') == '': # empty title
+                    continue
 
-                    row_data = {
-                        'Source': 'AP',
-                        'Section': sect,
-                        'Section URL': sector_dict[sect],
-                        'Article Title': header,
-                        'Article URL': url,
-                        'Date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), # Date scraped... No published dates on main pages
-                        'Image': img,
-                        'Subheading': subheader
-                    }
-                    if url not in collected_urls:
-                        collected_urls.add(url)
-                        all_data.append(row_data)
+                row_data = {
+                    'Source': 'AP',
+                    'Section': sect,
+                    'Section URL': section_url,
+                    'Article Title': header,
+                    'Article URL': url,
+                    'Date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), # Date scraped... No published dates on main pages
+                    'Image': img,
+                    'Subheading': subheader
+                }
+                if url not in collected_urls:
+                    collected_urls.add(url)
+                    all_data.append(row_data)
             driver.execute_script("window.scrollBy(0, 2000);")
             new_height = driver.execute_script("return window.scrollY;")
             if last_height == new_height:
                 end_of_page_checker += 1
             last_height = new_height
-    driver.quit()
-    for row in all_data:
-        collector.append_data(row)
 
-    return True
+    return all_data
 
 #===================================================================================
 #       NPR
 #===================================================================================
 def npr(collector):
-    #   Initialize
-    all_data = []
-
     #   Get Sections
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.get('https://www.npr.org/sections/news/')
-    driver.fullscreen_window()
-    sec_area = driver.find_element(By.CSS_SELECTOR,'.animated.fadeInRight')
-    sections = sec_area.find_elements(By.TAG_NAME,'li')
-    section_dict = {}
-    for s in sections:
-        a = s.find_element(By.TAG_NAME,'a')
-        section = a.text
-        section_url = a.get_attribute('href')
-        # Skip 'codeswitch' (audio articles)
-        if 'codeswitch' in section_url.lower():
-            continue
-        section_dict[section] = section_url
+    with driver_pool.driver() as driver:
+        driver.get('https://www.npr.org/sections/news/')
+        sec_area = driver.find_element(By.CSS_SELECTOR,'.animated.fadeInRight')
+        sections = sec_area.find_elements(By.TAG_NAME,'li')
+        section_dict = {}
+        for s in sections:
+            a = s.find_element(By.TAG_NAME,'a')
+            section = a.text
+            section_url = a.get_attribute('href')
+            # Skip 'codeswitch' (audio articles)
+            if 'codeswitch' in section_url.lower():
+                continue
+            section_dict[section] = section_url
 
     #   Go into section
-    for s in section_dict:
-        driver.get(section_dict[s])
+    return run_sections(collector, 'NPR', section_dict, npr_section)
+
+def npr_section(s, section_url):
+    #   Server-rendered, try plain HTTP before the browser
+    rows = static_scrape.scrape_section('NPR', s, section_url)
+    if rows:
+        return rows
+
+    all_data = []
+    collected_urls = set()
+    with driver_pool.driver() as driver:
+        driver.get(section_url)
         last_height = driver.execute_script("return document.body.scrollHeight")
-        collected_urls = set()
-        while True:
+        deadline = waits.Deadline(SECTION_TIMEOUT)
+        while not deadline.expired():
             #   Check for popup
             try:
                 iframe = driver.find_element(By.CSS_SELECTOR,'.tp-iframe-wrapper.tp-active').find_element(By.TAG_NAME,'iframe')
@@ -687,34 +611,24 @@ def npr(collector):
                 driver.switch_to.default_content()
             except:
                 pass
-            eles = driver.find_elements(By.CSS_SELECTOR,'.item.has-image')
-            
-            for e in eles:
-                header = e.find_element(By.CLASS_NAME,'title').find_element(By.TAG_NAME,'a')
-                url = header.get_attribute('href')
-                title = header.text
-
-                subh_area = e.find_element(By.CLASS_NAME,'teaser')
-                date = subh_area.find_element(By.TAG_NAME,'time').get_attribute('datetime')
-                subheader = subh_area.find_element(By.TAG_NAME,'a').text.split('•',1)[-1].strip()
-
-                img = e.find_element(By.TAG_NAME,'picture').find_element(By.TAG_NAME,'img').get_attribute('src')
+            for rec in extract.extract_records(driver, 'NPR'):
+                url = rec['url']
+                title = rec['title']
                 # check empty title
-                if title.replace(" ",'') == '':
+                if url is None or title is None or title.replace(" ",'') == '':
                     continue
                 if url not in collected_urls:
                     collected_urls.add(url)
 
-
                     row_data = {
                             'Source': 'NPR',
                             'Section': s,
-                            'Section URL': section_dict[s],
+                            'Section URL': section_url,
                             'Article Title': title,
                             'Article URL': url,
-                            'Date': date,
-                            'Image': img,
-                            'Subheading': subheader
+                            'Date': rec['date'],
+                            'Image': rec['image'],
+                            'Subheading': rec['subheading']
                         }
                     all_data.append(row_data)
             driver.execute_script("window.scrollBy(0, 2000);")
@@ -723,71 +637,61 @@ def npr(collector):
             if last_height == new_height:
                 break
             last_height = new_height
-    driver.quit()
-    for row in all_data:
-        collector.append_data(row)
 
-    return True
+    return all_data
 
 #===================================================================================
 #       HuffPost
 #===================================================================================
 def huffpost(collector):
+    with driver_pool.driver() as driver:
+        driver.get('https://www.huffpost.com')
+
+        section_dict = {}
+        dropdown = driver.find_element(By.XPATH, "//*[@aria-label='Open main menu']")
+        dropdown.click()
+        sec_area = driver.find_element(By.CLASS_NAME,'left-nav__menu')
+        sects = sec_area.find_elements(By.TAG_NAME,'a')
+
+        for s in sects:
+            section = s.get_attribute('data-vars-item-name')
+            section_url = s.get_attribute('href')
+            #   Skip '2024 election'
+            if '20' in section.lower() and 'election' in section.lower():
+                continue
+            if 'life' in section.lower():
+                break
+            section_dict[section] = section_url
+
+    #   Into sections (articles already recorded in another section are dropped by the collector)
+    return run_sections(collector, 'HuffPost', section_dict, huffpost_section)
+
+def huffpost_section(s, section_url):
+    #   Server-rendered, try plain HTTP (both pages) before the browser
+    rows = static_scrape.scrape_section('HuffPost', s, section_url)
+    if rows:
+        return rows
+
     all_data = []
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.get('https://www.huffpost.com')
-    driver.fullscreen_window()
-
-    section_dict = {}
-    dropdown = driver.find_element(By.XPATH, "//*[@aria-label='Open main menu']")
-    dropdown.click()
-    sec_area = driver.find_element(By.CLASS_NAME,'left-nav__menu')
-    sects = sec_area.find_elements(By.TAG_NAME,'a')
-
-    for s in sects:
-        section = s.get_attribute('data-vars-item-name')
-        section_url = s.get_attribute('href')
-        #   Skip '2024 election'
-        if '20' in section.lower() and 'election' in section.lower():
-            continue
-        if 'life' in section.lower():
-            break
-        section_dict[section] = section_url
-
-    #   For scrolling
-    viewport_height = driver.execute_script("return window.innerHeight")
-    #   Into sections
     visited_urls = set()
-    for s in section_dict:
+    with driver_pool.driver() as driver:
         page_2_check = False
-        driver.get(section_dict[s])
+        driver.get(section_url)
         #time.sleep(5)
 
         last_height = driver.execute_script("return document.body.scrollHeight")
         #for i in range(5):
             #driver.execute_script("window.scrollBy(0, 1000);")
-        while True:
-            items = driver.find_elements(By.CSS_SELECTOR,'.card.js-card')
-            for i in items:
-                try:
-                    url = i.find_element(By.TAG_NAME,'a').get_attribute('href')
-                except:
+        deadline = waits.Deadline(SECTION_TIMEOUT)
+        while not deadline.expired():
+            for rec in extract.extract_records(driver, 'HuffPost'):
+                url = rec['url']
+                title = rec['title']
+                if url is None or title is None:
                     continue
-                try:
-                    title = i.find_element(By.CLASS_NAME,'card__headline__text').text
-                    title = title.replace('Opinion:','').strip()
-                except:
-                    continue
-                try:
-                    img = i.find_element(By.TAG_NAME,'img').get_attribute('src')
-                except:
-                    img = None
-                try:
-                    subheader = i.find_element(By.CLASS_NAME,'card__description').text
-                except:
-                    subheader = None
+                title = title.replace('Opinion:','').strip()
+                img = rec['image']
+                subheader = rec['subheading']
                 
                 #   Check if article already recorded
                 if url in visited_urls  or title.count(' ') < 3:
@@ -797,7 +701,7 @@ def huffpost(collector):
                 row_data = {
                             'Source': 'HuffPost',
                             'Section': s,
-                            'Section URL': section_dict[s],
+                            'Section URL': section_url,
                             'Article Title': title,
                             'Article URL': url,
                             'Date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), # Date scraped... No published dates on main pages
@@ -825,70 +729,57 @@ def huffpost(collector):
                     break
             last_height = new_height
 
-    driver.quit()
-    for row in all_data:
-        collector.append_data(row)
-
-    return True
+    return all_data
 
 #===================================================================================
 #       CBS News
 #===================================================================================
 def cbs(collector):
-    all_data = []
-
-    options = Options()
-    options.add_argument('-headless')
-    driver = webdriver.Firefox(options=options)
-    driver.get('https://www.cbsnews.com/')
-    driver.fullscreen_window()
+    with driver_pool.driver() as driver:
+        driver.get('https://www.cbsnews.com/')
 
-    #   Get sections
+        #   Get sections
 
-    # 1st in list of site-nav__item ('Latest' tab)
-    hov_reg = driver.find_element(By.CLASS_NAME,'site-nav__item ')
-    hover_ele = hov_reg.find_element(By.CLASS_NAME,'site-nav__item-title')
-    hover = ActionChains(driver).move_to_element(hover_ele)
-    hover.perform()
+        # 1st in list of site-nav__item ('Latest' tab)
+        hov_reg = driver.find_element(By.CLASS_NAME,'site-nav__item ')
+        hover_ele = hov_reg.find_element(By.CLASS_NAME,'site-nav__item-title')
+        hover = ActionChains(driver).move_to_element(hover_ele)
+        hover.perform()
 
-    sec_eles = hov_reg.find_elements(By.TAG_NAME,'li')
+        sec_eles = hov_reg.find_elements(By.TAG_NAME,'li')
 
-    section_dict = {}
-    for s in sec_eles:
-        sec_ele = s.find_element(By.TAG_NAME,'a')
-        if 'sport' not in sec_ele.text.lower():
-            section_dict[sec_ele.text] = sec_ele.get_attribute('href')
+        section_dict = {}
+        for s in sec_eles:
+            sec_ele = s.find_element(By.TAG_NAME,'a')
+            if 'sport' not in sec_ele.text.lower():
+                section_dict[sec_ele.text] = sec_ele.get_attribute('href')
 
     #   Into Sections
-    for s in section_dict:
-        driver.get(section_dict[s])
+    return run_sections(collector, 'CBS', section_dict, cbs_section)
 
-        art_eles = driver.find_elements(By.TAG_NAME,'article')
-        
-        #   Into articles
-        for art in art_eles:
-            url = art.find_element(By.TAG_NAME,'a').get_attribute('href')
-            title = art.find_element(By.CLASS_NAME,'item__hed ').text
-            try:
-                subheader = art.find_element(By.CLASS_NAME,'item__dek').text
-            except:
-                subheader = None
+def cbs_section(s, section_url):
+    #   Server-rendered, try plain HTTP before the browser
+    rows = static_scrape.scrape_section('CBS', s, section_url)
+    if rows:
+        return rows
 
-            try:
-                img = art.find_element(By.TAG_NAME,'img').get_attribute('src')
-            except:
-                img = None
-            
-            try:
-                raw_date = art.find_element(By.CLASS_NAME,'item__date').text
-                date = clean_cbs_date(raw_date)
-            except:
-                raw_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    all_data = []
+    with driver_pool.driver() as driver:
+        driver.get(section_url)
+
+        #   Into articles, one round trip for the whole page
+        for rec in extract.extract_records(driver, 'CBS'):
+            url = rec['url']
+            title = rec['title']
+            if url is None or title is None:
+                continue
+            subheader = rec['subheading']
+            img = rec['image']
 
             row_data = {
                         'Source': 'CBS',
                         'Section': s,
-                        'Section URL': section_dict[s],
+                        'Section URL': section_url,
                         'Article Title': title,
                         'Article URL': url,
                         'Date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), # Date scraped... No published dates on main pages
@@ -896,9 +787,5 @@ def cbs(collector):
                         'Subheading': subheader
                     }
             all_data.append(row_data)
-            
-    driver.quit()
-    for row in all_data:
-        collector.append_data(row)
 
-    return True
+    return all_data
@@ -0,0 +1,62 @@
+#=======================================
+#    scroll_harvest.py
+#        Incremental infinite-scroll harvesting.
+#        Every step marks the article nodes it has already read (a node cursor kept in the DOM), so each
+#        scroll only returns nodes added since the previous step. Scrolling stops as soon as a step adds
+#        nothing new or only turns up articles we already have.
+#=======================================
+
+import extract
+import waits
+
+MARK = 'data-harvested'
+
+def harvest_script(source):
+    site = extract.SITES[source]
+    return f"""{extract.COMMON_JS}
+const item = {site['ITEM']};
+const fresh = {site['NODES']}.filter(el => !el.hasAttribute('{MARK}'));
+fresh.forEach(el => el.setAttribute('{MARK}', ''));
+const records = fresh.map(item);
+if (arguments[0]) window.scrollBy(0, arguments[0]);
+return {{records: records, y: window.scrollY}};"""
+
+def harvest(driver, source, step=None, max_steps=None, max_height=None, known_urls=None, settle_timeout=2, before_step=None):
+    """
+    Scroll the current page and yield article records as they appear, each node only once.
+
+    Args:
+        step (int): Pixels per scroll. Defaults to the viewport height.
+        max_steps (int): Hard cap on scroll steps.
+        max_height (int): Stop once scrolled past this many pixels.
+        known_urls (container): URLs already stored. A step that only finds these ends the harvest.
+        settle_timeout (float): Longest wait for the network to go quiet after each scroll.
+        before_step (callable): Called with the driver before each step, e.g. to close popups.
+    """
+    script = harvest_script(source)
+    if step is None:
+        step = driver.execute_script("return window.innerHeight;")
+    last_y = None
+    steps = 0
+    while True:
+        if before_step is not None:
+            before_step(driver)
+        #   Read the new nodes and scroll in the same round trip
+        result = driver.execute_script(script, step)
+        records = result['records']
+        yield from records
+
+        steps += 1
+        #   Nothing new since the last scroll, or we've reached articles already in the database
+        if steps > 1 and not records:
+            break
+        urls = [r['url'] for r in records if r['url']]
+        if known_urls is not None and urls and all(url in known_urls for url in urls):
+            break
+        #   Bottom of the page or a cap
+        if result['y'] == last_y:
+            break
+        if (max_steps is not None and steps > max_steps) or (max_height is not None and result['y'] >= max_height):
+            break
+        last_y = result['y']
+        waits.settle(driver, timeout=settle_timeout)
@@ -1,16 +1,163 @@
-import pandas as pd
+import os
+import json
+import glob
+import shutil
+import threading
+from datetime import date
 
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+COLUMNS = ['Source', 'Section', 'Section URL', 'Article Title', 'Article URL', 'Date', 'Image', 'Subheading']
+SCHEMA = pa.schema([(c, pa.string()) for c in COLUMNS])
+CHECKPOINT_DIR = 'checkpoints'
+FLUSH_ROWS = 500            #   Rows buffered before a row group is written to disk
+
+def _cell(value):
+    return None if value is None else str(value)
+
+#===================================================================================
+#   Collector
+#       Rows go into one buffer per column. Once FLUSH_ROWS have built up (checked at
+#       section boundaries), the buffer is written out as a parquet part, one row group,
+#       and dropped from memory:
+#           checkpoints/<YYYY-MM-DD>/<name>/part-00000.parquet ...
+#           checkpoints/<YYYY-MM-DD>/<name>/sections.json      sections whose rows are all on disk
+#       A collector created with the same name on the same day picks up the parts and the
+#       finished sections, so a rerun after a crash only scrapes what's missing.
+#       Without a name nothing is written to disk.
+#       listener, if given, is called with every batch of newly added rows (e.g. to start NLP early).
+#===================================================================================
 class DataCollector:
-    def __init__(self):
-        self.data_list = []
+    def __init__(self, name=None, checkpoint_dir=CHECKPOINT_DIR, flush_rows=FLUSH_ROWS, listener=None):
+        self.listener = listener
+        self.columns = {c: [] for c in COLUMNS}
+        self.buffered = 0
+        self.seen_urls = set()
+        self.lock = threading.Lock()
+        self.flush_rows = flush_rows
+        self.pending_sections = []          #   Finished, but their rows are still in the buffer
+        self.completed_sections = set()     #   Finished and on disk
+        self.path = None
+        self.parts = []
+        if name is not None:
+            self.path = os.path.join(checkpoint_dir, date.today().isoformat(), name)
+            os.makedirs(self.path, exist_ok=True)
+            self._resume()
+
+    def _resume(self):
+        self.parts = sorted(glob.glob(os.path.join(self.path, 'part-*.parquet')))
+        for part in self.parts:
+            self.seen_urls.update(pq.read_table(part, columns=['Article URL']).column(0).to_pylist())
+        try:
+            with open(os.path.join(self.path, 'sections.json')) as f:
+                self.completed_sections = set(json.load(f))
+        except (OSError, ValueError):
+            pass
+        if self.parts:
+            print(f"Resuming {self.path}: {len(self.seen_urls)} rows, {len(self.completed_sections)} sections done")
+
+    def _add(self, row):
+        url = row.get('Article URL')
+        if url in self.seen_urls:
+            return False
+        self.seen_urls.add(url)
+        for c in COLUMNS:
+            self.columns[c].append(_cell(row.get(c)))
+        self.buffered += 1
+        return True
+
+    #   Rows whose url isn't collected yet (first one wins within the batch). Run this to finish rows
+    #       (e.g. images) before extend_data: their values are copied into the column buffers there.
+    def unseen(self, rows):
+        with self.lock:
+            seen = set(self.seen_urls)
+        fresh = []
+        for row in rows:
+            url = row.get('Article URL')
+            if url not in seen:
+                seen.add(url)
+                fresh.append(row)
+        return fresh
 
     def append_data(self, new_data):
-        self.data_list.append(new_data)
+        self.extend_data([new_data])
+
+    #   Merge a batch of rows (e.g. one section), skipping urls already collected. Returns the rows added.
+    def extend_data(self, rows):
+        with self.lock:
+            added = [row for row in rows if self._add(row)]
+        if added and self.listener is not None:
+            self.listener(added)
+        return added
+
+    def section_done(self, section):
+        return section in self.completed_sections
+
+    #   Rows added so far are final (images resolved). Checkpoints once enough rows are buffered.
+    def flush(self, section=None):
+        with self.lock:
+            if section is not None:
+                self.pending_sections.append(section)
+            if self.path is not None and self.buffered >= self.flush_rows:
+                self._write_part()
+
+    def close(self):
+        #   Write whatever is left
+        with self.lock:
+            if self.path is not None and (self.buffered or self.pending_sections):
+                self._write_part()
+
+    def _write_part(self):
+        if self.buffered:
+            part = os.path.join(self.path, f'part-{len(self.parts):05d}.parquet')
+            pq.write_table(self._buffer_table(), part + '.tmp')
+            os.replace(part + '.tmp', part)
+            self.parts.append(part)
+            self.columns = {c: [] for c in COLUMNS}
+            self.buffered = 0
+        #   Sections only count as done once their rows are on disk
+        self.completed_sections.update(self.pending_sections)
+        self.pending_sections = []
+        manifest = os.path.join(self.path, 'sections.json')
+        with open(manifest + '.tmp', 'w') as f:
+            json.dump(sorted(self.completed_sections), f)
+        os.replace(manifest + '.tmp', manifest)
+
+    def _buffer_table(self):
+        return pa.Table.from_pydict(self.columns, schema=SCHEMA)
+
+    def get_table(self):
+        with self.lock:
+            tables = [pq.read_table(part) for part in self.parts] + [self._buffer_table()]
+        return pa.concat_tables(tables)
 
     def get_dataframe(self):
-        return pd.DataFrame(self.data_list)
+        return self.get_table().to_pandas()
+
+    #   Done with this site for the day, a rerun starts fresh
+    def clear_checkpoint(self):
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.parts = []
+
+#   Checkpoints only resume on the day they were made, older day dirs are dead weight.
+#       Called when a run starts, before any collector for today exists.
+def prune_checkpoints(checkpoint_dir=CHECKPOINT_DIR):
+    today = date.today().isoformat()
+    pruned = 0
+    for path in glob.glob(os.path.join(checkpoint_dir, '*')):
+        day = os.path.basename(path)
+        try:
+            date.fromisoformat(day)
+        except ValueError:
+            continue
+        if day < today:
+            shutil.rmtree(path, ignore_errors=True)
+            pruned += 1
+    return pruned
 
 #   Thought there would be more. But just the data class for now. Too lazy to optimize just keep it
 def init_shared_resources():
     collector = DataCollector()
-    return collector
\ No newline at end of file
+    return collector
@@ -0,0 +1,92 @@
+#=======================================
+#    stages.py
+#        Typed handoff between pipeline stages (scrape -> keywords -> dedup -> clustering -> db).
+#        Each stage's output is an Arrow table, kept in memory for the next stage and written to
+#        stages/<name>.parquet so a stage can be rerun or inspected without redoing the ones before it.
+#        Keyword/URL/headline lists stay lists (no str() + ast.literal_eval round trip), and only what
+#        the run itself produced is read back: no more globbing the working directory for csvs.
+#=======================================
+
+import os
+
+#   pyarrow is imported on first use: main and pipeline import this module for every stage,
+#       including ones that never touch a table (--only-stage stop_instance)
+
+STAGE_DIR = 'stages'
+
+_schemas = None
+
+def schemas():
+    global _schemas
+    if _schemas is None:
+        import pyarrow as pa
+        import shared
+        string_list = pa.list_(pa.string())
+        _schemas = {
+            #   Rows straight from the scrapers, all sites
+            'scraped': shared.SCHEMA,
+            #   Scraped rows + keywords, dates normalized
+            'articles': shared.SCHEMA.append(pa.field('Keywords', string_list)),
+            #   One row per cluster of similar articles
+            'simart': pa.schema([
+                ('Article Headlines', string_list),
+                ('Article URLs', string_list),
+                ('Keywords', string_list),
+                ('Similarity Weights', pa.float64()),
+            ]),
+            #   Cluster summaries from the second instance
+            'summaries': pa.schema([
+                ('simart_id', pa.int64()),
+                ('summary', pa.string()),
+            ]),
+        }
+    return _schemas
+
+_memory = {}
+
+def path_for(name):
+    return os.path.join(STAGE_DIR, f'{name}.parquet')
+
+def to_table(name, data):
+    import pyarrow as pa
+    if isinstance(data, pa.Table):
+        table = data
+    else:
+        schema = schemas().get(name)
+        if schema is not None:
+            data = data[schema.names]
+        table = pa.Table.from_pandas(data, schema=schema, preserve_index=False)
+    if name in schemas():
+        table = table.select(schemas()[name].names).cast(schemas()[name])
+    return table
+
+def put(name, data, persist=True):
+    """Hand a stage's output (DataFrame or Arrow table) to the next stage. Returns the table."""
+    import pyarrow.parquet as pq
+    table = to_table(name, data)
+    _memory[name] = table
+    if persist:
+        os.makedirs(STAGE_DIR, exist_ok=True)
+        path = path_for(name)
+        pq.write_table(table, path + '.tmp')
+        os.replace(path + '.tmp', path)
+    return table
+
+def get(name):
+    """Output of an earlier stage, from this run if it ran, otherwise from its parquet file."""
+    if name not in _memory:
+        import pyarrow.parquet as pq
+        path = path_for(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No output for stage '{name}' (expected {path}), run that stage first")
+        _memory[name] = to_table(name, pq.read_table(path))
+    return _memory[name]
+
+def get_dataframe(name):
+    import pyarrow as pa
+    #   List columns come back as numpy arrays, turn them back into lists
+    df = get(name).to_pandas()
+    for field in get(name).schema:
+        if pa.types.is_list(field.type):
+            df[field.name] = df[field.name].apply(lambda v: list(v) if v is not None else [])
+    return df
@@ -0,0 +1,201 @@
+#=======================================
+#    static_scrape.py
+#        HTTP-first section scraping. Parses server-rendered section pages with requests + lxml,
+#        mirroring the Selenium selectors in scrape.py.
+#        Returns [] whenever the static parse comes up empty so the caller falls back to Selenium.
+#=======================================
+
+import threading
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html
+
+#   Sites whose section pages are built client side. Never tried statically.
+JS_ONLY = {'FOX', 'CNN', 'WAPO', 'NYT'}
+
+TIMEOUT = (5, 15)   # (connect, read) seconds
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+}
+
+#===================================================================================
+#   Session / helpers
+#===================================================================================
+_local = threading.local()
+
+def get_session():
+    #   requests.Session isn't thread safe, one keep-alive session per scraper thread
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=1)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+    return session
+
+def fetch_page(url):
+    response = get_session().get(url, timeout=TIMEOUT)
+    response.raise_for_status()
+    tree = html.fromstring(response.content)
+    tree.make_links_absolute(response.url)
+    return tree
+
+#   XPath for a class token, same matching as By.CLASS_NAME / CSS '.cls'
+def cls(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def first(node, xpath):
+    found = node.xpath(xpath)
+    return found[0] if found else None
+
+#   Collapse whitespace like WebElement.text does
+def text_of(node):
+    if node is None:
+        return ''
+    return ' '.join(node.text_content().split())
+
+def attr_of(node, name):
+    return node.get(name) if node is not None else None
+
+def now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+#===================================================================================
+#   Site parsers
+#       Each takes the parsed tree and returns a list of row dicts (minus Source/Section info).
+#===================================================================================
+def parse_npr(tree):
+    rows = []
+    for e in tree.xpath(f"//*[{cls('item')} and {cls('has-image')}]"):
+        header = first(e, f".//*[{cls('title')}]//a")
+        subh_area = first(e, f".//*[{cls('teaser')}]")
+        img = first(e, ".//picture//img")
+        if header is None or subh_area is None:
+            continue
+        title = text_of(header)
+        if title.replace(' ', '') == '':
+            continue
+        rows.append({
+            'Article Title': title,
+            'Article URL': header.get('href'),
+            'Date': attr_of(first(subh_area, ".//time"), 'datetime'),
+            'Image': attr_of(img, 'src'),
+            'Subheading': text_of(first(subh_area, ".//a")).split('•', 1)[-1].strip()
+        })
+    return rows
+
+def parse_cbs(tree):
+    rows = []
+    for art in tree.xpath("//article"):
+        link = first(art, ".//a")
+        title = first(art, f".//*[{cls('item__hed')}]")
+        if link is None or title is None:
+            continue
+        subheader = first(art, f".//*[{cls('item__dek')}]")
+        rows.append({
+            'Article Title': text_of(title),
+            'Article URL': link.get('href'),
+            'Date': now(),    # Date scraped, same as the Selenium path
+            'Image': attr_of(first(art, ".//img"), 'src'),
+            'Subheading': text_of(subheader) if subheader is not None else None
+        })
+    return rows
+
+def parse_ap(tree):
+    rows = []
+    #   Skip first 2 segments; it's just the header section
+    for seg in tree.xpath(f"//*[{cls('PageList-items')}]")[2:]:
+        for i in seg.xpath(f".//*[{cls('PageList-items-item')}]"):
+            titles = i.xpath(f".//*[{cls('PagePromoContentIcons-text')}]")
+            link = first(i, ".//a")
+            if not titles or link is None:
+                continue
+            header = text_of(titles[0])
+            if header.replace(' ', '') == '':
+                continue
+            subheader = text_of(titles[1]) if len(titles) > 1 else None
+            if subheader is not None and subheader.replace(' ', '') == '':
+                subheader = None
+            rows.append({
+                'Article Title': header,
+                'Article URL': link.get('href'),
+                'Date': now(),    # No published dates on main pages
+                'Image': attr_of(first(i, ".//source"), 'srcset'),
+                'Subheading': subheader
+            })
+    return rows
+
+def parse_huffpost(tree):
+    rows = []
+    for i in tree.xpath(f"//*[{cls('card')} and {cls('js-card')}]"):
+        link = first(i, ".//a")
+        title = first(i, f".//*[{cls('card__headline__text')}]")
+        if link is None or title is None:
+            continue
+        title = text_of(title).replace('Opinion:', '').strip()
+        if title.count(' ') < 3:
+            continue
+        subheader = first(i, f".//*[{cls('card__description')}]")
+        rows.append({
+            'Article Title': title,
+            'Article URL': link.get('href'),
+            'Date': now(),    # No published dates on main pages
+            'Image': attr_of(first(i, ".//img"), 'src'),
+            'Subheading': text_of(subheader) if subheader is not None else None
+        })
+    return rows
+
+#   HuffPost sections continue on a second page, same as the Selenium path's 'pagination__next-link' click
+def next_page_huffpost(tree):
+    return attr_of(first(tree, f"//*[{cls('pagination__next-link')}]"), 'href')
+
+PARSERS = {
+    'NPR': parse_npr,
+    'CBS': parse_cbs,
+    'AP': parse_ap,
+    'HuffPost': parse_huffpost,
+}
+
+NEXT_PAGE = {
+    'HuffPost': next_page_huffpost,
+}
+
+#===================================================================================
+#   Entry point
+#===================================================================================
+def scrape_section(source, section, section_url, max_pages=2):
+    """Scrape one section page over plain HTTP. Returns [] if the site needs a browser or the parse found nothing."""
+    if source in JS_ONLY or source not in PARSERS:
+        return []
+    parser = PARSERS[source]
+    rows = []
+    seen = set()
+    url = section_url
+    for _ in range(max_pages):
+        try:
+            tree = fetch_page(url)
+        except (requests.RequestException, ValueError) as e:
+            #   Keep what the earlier pages gave us, otherwise hand over to the browser
+            if not rows:
+                print(f"Static scrape failed for {source} {section}, using browser: {e}")
+            break
+        for row in parser(tree):
+            if not row['Article URL'] or row['Article URL'] in seen:
+                continue
+            seen.add(row['Article URL'])
+            rows.append({
+                'Source': source,
+                'Section': section,
+                'Section URL': section_url,
+                **row
+            })
+        url = NEXT_PAGE[source](tree) if source in NEXT_PAGE else None
+        if not url:
+            break
+    return rows
@@ -2,14 +2,9 @@ import pandas as pd
 import numpy as np
 import os
 import re
-import boto3
 import logging
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
 
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from rouge import Rouge
-
-import utils
+#   transformers (torch) and boto3 are imported where they're used, see bench_imports.py
 
 def stop_ec2_instance(instance_id):
     """
@@ -18,6 +13,8 @@ def stop_ec2_instance(instance_id):
     Args:
         instance_id (str): The ID of the EC2 instance to stop.
     """
+    import boto3
+    from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
     try:
         # Create an EC2 client
         ec2_client = boto3.client('ec2', region_name='us-west-1')
@@ -104,6 +101,7 @@ def generate_summary2(model, tokenizer, article_clust):
 #   Takes dataframe of grouped articles
 #   Returns dataframe of summaries and simart_id's
 def summarize(df):
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
     grouped_df = df.groupby('simart_id')['article_content'].apply(list).reset_index()
     grouped_df = clean(grouped_df)
     tokenizer = AutoTokenizer.from_pretrained("allenai/PRIMERA")
@@ -0,0 +1,336 @@
+#=======================================
+#    supervisor.py
+#        Runs the site scrapers side by side with a time budget per site, returns each site's rows as an Arrow table.
+#        A site that runs past its budget has its browsers cancelled and is reported as timed out,
+#        the rest of the pipeline carries on with the sites that finished (and, in partial mode,
+#        whatever the late site had collected so far).
+#        Sites that fail several runs in a row trip a circuit breaker and sit out the next run.
+#
+#        Two modes:
+#            run_sites            one thread per site in this process (shared browser pool)
+#            run_site_processes   one worker process per site. Workers stream row batches back over a
+#                                 pipe of their own, the parent assembles them. A crash or memory
+#                                 blowup only takes down that site, and parsing isn't fighting over one GIL.
+#                                 No more workers run at once than the browser cap allows.
+#=======================================
+
+import os
+import json
+import time
+import signal
+import threading
+import multiprocessing
+import multiprocessing.connection
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import driver_pool
+from shared import DataCollector, prune_checkpoints
+
+SITE_TIMEOUT = 15 * 60      #   Default budget per site, seconds of scraping (time queued for a browser doesn't count)
+SITE_TIMEOUTS = {           #   Per-site overrides
+    'WAPO': 10 * 60,        #   Paywall modal
+    'NYT': 10 * 60,
+}
+BREAKER_PATH = 'circuit_breaker.json'
+FAILURE_LIMIT = 2           #   Consecutive failed runs before a site is skipped
+COOLDOWN_RUNS = 1           #   Runs a tripped site sits out before it gets another try
+
+#===================================================================================
+#   Circuit breaker
+#       {site: {"failures": n, "skipped": k}} on disk: consecutive failed runs, and runs skipped since
+#       the breaker tripped. After COOLDOWN_RUNS skipped runs the site is tried again: a success
+#       closes the breaker, another failure skips it for COOLDOWN_RUNS more runs.
+#       Counted per run, not per day (same day reruns don't scrape again, see main.py).
+#===================================================================================
+class CircuitBreaker:
+    def __init__(self, path=BREAKER_PATH, limit=FAILURE_LIMIT, cooldown=COOLDOWN_RUNS):
+        self.path = path
+        self.limit = limit
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _entry(self, site):
+        entry = self.state.setdefault(site, {})
+        entry.setdefault('failures', 0)
+        entry.setdefault('skipped', 0)
+        return entry
+
+    #   Called once per run and site: True means skip it this run
+    def is_open(self, site):
+        with self.lock:
+            entry = self._entry(site)
+            if entry['failures'] < self.limit or entry['skipped'] >= self.cooldown:
+                return False
+            entry['skipped'] += 1
+            self._save()
+            return True
+
+    def record(self, site, ok):
+        with self.lock:
+            entry = self._entry(site)
+            entry['failures'] = 0 if ok else entry['failures'] + 1
+            entry['skipped'] = 0
+            self._save()
+
+    def _save(self):
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.state, f, indent=2)
+        except OSError as e:
+            print(f"Could not save circuit breaker state: {e}")
+
+#===================================================================================
+#   Supervisor
+#===================================================================================
+def _scrape(name, func, collector):
+    with driver_pool.owned_by(name):
+        func(collector)
+
+def _finish(name, state, collector, results, breaker, partial):
+    status, tables = results
+    status[name] = state
+    if state == 'ok' or partial:
+        #   Checkpointed parts + whatever is still buffered
+        tables[name] = collector.get_table()
+        print(f"{name}: {tables[name].num_rows} rows ({state})")
+    #   Finished sites start fresh on the next run, the others resume from their checkpoint
+    if state == 'ok':
+        collector.clear_checkpoint()
+    else:
+        collector.close()
+    breaker.record(name, state == 'ok')
+
+#   Sites the circuit breaker lets through
+def _startable(sites, breaker, status):
+    startable = []
+    for name, func in sites:
+        if breaker.is_open(name):
+            print(f"{name}: skipped, failed the last {breaker.limit}+ runs")
+            status[name] = 'skipped'
+            continue
+        startable.append((name, func))
+    return startable
+
+def run_sites(sites, partial=True, timeouts=None, breaker=None, listener=None):
+    """
+    Scrape every site in parallel, each within its own budget.
+    A site's clock only runs while it isn't queued for a browser (driver_pool.DriverPool.stalled),
+    so on a small pool, sites waiting their turn aren't timed out for it.
+
+    Args:
+        sites (list): (name, scrape function) tuples.
+        partial (bool): Keep the rows a timed out or failed site collected before it stopped.
+        timeouts (dict): Per-site budget in seconds, falls back to SITE_TIMEOUTS / SITE_TIMEOUT.
+        breaker (CircuitBreaker): Defaults to the on-disk breaker.
+        listener (callable): Called with each batch of new rows as it arrives, from the scraping threads.
+
+    Returns:
+        dict: name -> 'ok', 'timeout', 'failed' or 'skipped'.
+        dict: name -> pyarrow.Table of rows, for sites that finished (or all that got rows, in partial mode).
+    """
+    timeouts = timeouts if timeouts is not None else SITE_TIMEOUTS
+    breaker = breaker if breaker is not None else CircuitBreaker()
+    prune_checkpoints()
+    pool = driver_pool.get_pool()
+    status = {}
+    results = (status, {})
+    running = {}        #   future -> [name, collector, seconds left]
+
+    executor = ThreadPoolExecutor(max_workers=len(sites))
+    for name, func in _startable(sites, breaker, status):
+        pool.reopen(name)
+        collector = DataCollector(name, listener=listener)
+        future = executor.submit(_scrape, name, func, collector)
+        running[future] = [name, collector, timeouts.get(name, SITE_TIMEOUT)]
+        print(f"{name}: started")
+
+    try:
+        last = time.monotonic()
+        while running:
+            #   Wake at least every second to charge the sites that are actually scraping
+            next_out = min(entry[2] for entry in running.values())
+            done, _ = wait(running, timeout=min(1.0, max(0.0, next_out)), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            for entry in running.values():
+                if not pool.stalled(entry[0]):
+                    entry[2] -= now - last
+            last = now
+            for future in done:
+                name, collector, _ = running.pop(future)
+                try:
+                    future.result()
+                    state = 'ok'
+                except Exception as e:
+                    print(f"{name}: failed: {e}")
+                    state = 'failed'
+                _finish(name, state, collector, results, breaker, partial)
+            #   Out of budget: kill the site's browsers, its thread unwinds on its own
+            for future in [f for f, entry in running.items() if entry[2] <= 0]:
+                name, collector, _ = running.pop(future)
+                cancelled = pool.cancel(name)
+                print(f"{name}: timed out, cancelled {cancelled} browser(s)")
+                _finish(name, 'timeout', collector, results, breaker, partial)
+    finally:
+        #   Don't wait for cancelled sites to unwind
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+#===================================================================================
+#   Process mode
+#===================================================================================
+class StreamingCollector(DataCollector):
+    """Worker side collector: rows are sent to the parent in batches on flush(). The parent checkpoints them."""
+    def __init__(self, name, channel, completed_sections=()):
+        super().__init__()
+        self.name = name
+        self.channel = channel
+        self.send_lock = threading.Lock()
+        self.pending = []
+        self.completed_sections = set(completed_sections)
+
+    def extend_data(self, rows):
+        added = super().extend_data(rows)
+        with self.lock:
+            self.pending += added
+        return added
+
+    def send(self, kind, payload):
+        #   Section threads and the site's own thread share the pipe
+        with self.send_lock:
+            self.channel.send((kind, payload))
+
+    def flush(self, section=None):
+        with self.lock:
+            batch, self.pending = self.pending, []
+            #   Only urls are needed for dedup from here on
+            self.columns = {c: [] for c in self.columns}
+            self.buffered = 0
+        if batch or section is not None:
+            self.send('rows', (batch, section))
+
+def _worker(name, func, channel, max_drivers, completed_sections):
+    #   This process's own browser pool, sized to its share of the machine
+    os.environ['SCRAPE_MAX_DRIVERS'] = str(max_drivers)
+    driver_pool._pool = None
+    pool = driver_pool.get_pool()
+    #   Parent timed us out: quit our browsers before going, geckodriver/firefox would outlive us otherwise.
+    #       The handler only writes to a pipe: it runs on the main thread, which may be holding the
+    #       pool's lock, so the cancel happens on a thread of its own.
+    wake_read, wake_write = os.pipe()
+    def _terminate():
+        os.read(wake_read, 1)
+        pool.cancel(name)
+        pool.close()
+        os._exit(1)
+    threading.Thread(target=_terminate, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: os.write(wake_write, b'x'))
+
+    collector = StreamingCollector(name, channel, completed_sections)
+    try:
+        with driver_pool.owned_by(name):
+            func(collector)
+        collector.flush()
+        collector.send('done', None)
+    except Exception as e:
+        collector.flush()
+        collector.send('failed', repr(e))
+    finally:
+        pool.close()
+
+def _stop(process, grace=driver_pool.QUIT_TIMEOUT + 5):
+    process.terminate()
+    process.join(grace)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+def run_site_processes(sites, partial=True, timeouts=None, breaker=None, listener=None):
+    """
+    Same as run_sites, but every site runs in its own worker process.
+    Browsers stay within driver_pool.default_pool_size() overall: at most that many workers run at
+    once, each with an equal share of the browsers. The other sites wait for a worker to finish,
+    their deadline starts when their worker does.
+
+    Returns:
+        Same as run_sites.
+    """
+    timeouts = timeouts if timeouts is not None else SITE_TIMEOUTS
+    breaker = breaker if breaker is not None else CircuitBreaker()
+    prune_checkpoints()
+    status = {}
+    results = (status, {})
+    waiting = _startable(sites, breaker, status)
+    if not waiting:
+        return results
+
+    #   forkserver: workers fork from a clean server process, not from this one (which has the NLP
+    #       stream and torch threads running, a fork would copy their locks mid-use)
+    ctx = multiprocessing.get_context('forkserver')
+    ctx.set_forkserver_preload(['supervisor', 'scrape'])
+    browsers = driver_pool.default_pool_size()
+    workers = min(len(waiting), browsers)
+    max_drivers = browsers // workers
+    running = {}        #   name -> (process, pipe, collector, deadline)
+
+    def _start(name, func):
+        #   The parent holds the checkpointed collector, workers only skip the sections it already has
+        collector = DataCollector(name, listener=listener)
+        #   A pipe per worker: killing one mid-send can't leave a lock or half a message behind
+        #       for the others (a shared Queue would)
+        reader, writer = ctx.Pipe(duplex=False)
+        args = (name, func, writer, max_drivers, collector.completed_sections)
+        process = ctx.Process(target=_worker, args=args, name=f"scrape-{name}")
+        process.start()
+        writer.close()
+        deadline = time.monotonic() + timeouts.get(name, SITE_TIMEOUT)
+        running[name] = (process, reader, collector, deadline)
+        print(f"{name}: started (pid {process.pid}, {max_drivers} browser(s))")
+
+    def _end(name, state):
+        process, reader, collector, _ = running.pop(name)
+        if state == 'timeout':
+            _stop(process)
+        else:
+            #   The worker still closes its browsers after reporting back, don't wait on a hung quit forever
+            process.join(driver_pool.QUIT_TIMEOUT + 5)
+            if process.is_alive():
+                _stop(process)
+        reader.close()
+        _finish(name, state, collector, results, breaker, partial)
+
+    while running or waiting:
+        while waiting and len(running) < workers:
+            _start(*waiting.pop(0))
+        next_deadline = min(entry[3] for entry in running.values())
+        readers = {entry[1]: name for name, entry in running.items()}
+        ready = multiprocessing.connection.wait(list(readers), timeout=min(1.0, max(0.0, next_deadline - time.monotonic())))
+        for reader in ready:
+            name = readers[reader]
+            collector = running[name][2]
+            try:
+                kind, payload = reader.recv()
+            except (EOFError, OSError):
+                #   Died without reporting back (segfault, OOM killer)
+                running[name][0].join(1)
+                print(f"{name}: worker died (exit code {running[name][0].exitcode})")
+                _end(name, 'failed')
+                continue
+            if kind == 'rows':
+                batch, section = payload
+                collector.extend_data(batch)
+                collector.flush(section=section)
+            else:
+                if kind == 'failed':
+                    print(f"{name}: failed: {payload}")
+                _end(name, 'ok' if kind == 'done' else 'failed')
+        now = time.monotonic()
+        for name, entry in list(running.items()):
+            if entry[3] <= now:
+                print(f"{name}: timed out, stopping worker")
+                _end(name, 'timeout')
+    return results
@@ -0,0 +1,81 @@
+#=======================================
+#    test_scrape.py
+#        python -m pytest -q     (from run/scrapers, no browser or network needed)
+#=======================================
+
+import os
+
+import pytest
+
+import images
+import scrape
+import shared
+import url_index
+
+def _row(url, image=None):
+    return {
+        'Source': 'FOX', 'Section': 'World', 'Section URL': 'https://www.foxnews.com/world',
+        'Article Title': f'Title {url}', 'Article URL': url, 'Date': '2024-01-01',
+        'Image': image, 'Subheading': None,
+    }
+
+def test_resolved_images_reach_the_table(monkeypatch):
+    monkeypatch.setattr(url_index, 'get_index', lambda: set())
+    def resolve(rows):
+        for row in rows:
+            if row['Image'] is None:
+                row['Image'] = f"{row['Article URL']}/image.jpg"
+        return rows
+    monkeypatch.setattr(images, 'resolve_images', resolve)
+
+    sections = {
+        'World': lambda: [_row('https://a'), _row('https://b', image='https://b/inline.jpg')],
+        #   Already collected from the first section: must not be resolved or added twice
+        'Politics': lambda: [_row('https://a'), _row('https://c')],
+    }
+    collector = shared.DataCollector()
+    scrape.run_sections(collector, 'FOX', {s: s for s in sections}, lambda s, url: sections[s]())
+
+    table = collector.get_table()
+    assert table.column('Article URL').to_pylist() == ['https://a', 'https://b', 'https://c']
+    assert table.column('Image').to_pylist() == ['https://a/image.jpg', 'https://b/inline.jpg', 'https://c/image.jpg']
+
+def test_known_articles_are_kept_without_an_image_lookup(monkeypatch):
+    monkeypatch.setattr(url_index, 'get_index', lambda: {'https://stored'})
+    resolved = []
+    def resolve(rows):
+        resolved.extend(row['Article URL'] for row in rows)
+        return rows
+    monkeypatch.setattr(images, 'resolve_images', resolve)
+
+    collector = shared.DataCollector()
+    scrape.run_sections(collector, 'FOX', {'World': 'World'}, lambda s, url: [_row('https://stored'), _row('https://new')])
+
+    #   Stored articles still reach clustering, only new ones cost an image lookup
+    assert collector.get_table().column('Article URL').to_pylist() == ['https://stored', 'https://new']
+    assert resolved == ['https://new']
+
+def test_site_fails_when_every_section_fails(monkeypatch):
+    monkeypatch.setattr(url_index, 'get_index', lambda: set())
+    def broken(s, url):
+        raise ValueError('layout changed')
+    collector = shared.DataCollector()
+    with pytest.raises(scrape.SectionsFailed):
+        scrape.run_sections(collector, 'FOX', {'World': 'World', 'Politics': 'Politics'}, broken)
+
+    #   One good section is enough for the site to count as scraped
+    def flaky(s, url):
+        if s == 'Politics':
+            raise ValueError('timeout')
+        return [_row('https://a')]
+    monkeypatch.setattr(images, 'resolve_images', lambda rows: rows)
+    assert scrape.run_sections(shared.DataCollector(), 'FOX', {'World': 'World', 'Politics': 'Politics'}, flaky)
+
+def test_old_checkpoint_days_are_pruned(tmp_path):
+    for day in ['2020-01-01', '2020-01-02']:
+        (tmp_path / day / 'FOX').mkdir(parents=True)
+    (tmp_path / 'notes').mkdir()
+    today = shared.DataCollector('FOX', checkpoint_dir=str(tmp_path))
+
+    assert shared.prune_checkpoints(str(tmp_path)) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(['notes', os.path.basename(os.path.dirname(today.path))])
@@ -0,0 +1,54 @@
+#=======================================
+#    test_supervisor.py
+#        python -m pytest -q     (from run/scrapers, no browser needed)
+#=======================================
+
+import time
+
+import driver_pool
+import supervisor
+
+class FakeDriver:
+    def __init__(self, max_pages=driver_pool.MAX_PAGES):
+        self.pages = 0
+        self.owner = None
+        self.cancelled = False
+
+    def alive(self):
+        return True
+
+    def reset(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+def _site(hold):
+    def scrape(collector):
+        with driver_pool.driver():
+            time.sleep(hold)
+    return scrape
+
+def test_time_queued_for_a_browser_is_not_charged(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(driver_pool, 'PooledDriver', FakeDriver)
+    monkeypatch.setattr(driver_pool, '_pool', driver_pool.DriverPool(size=1))
+    breaker = supervisor.CircuitBreaker(path=str(tmp_path / 'breaker.json'))
+
+    #   B waits ~1.5s for A's browser, then needs 0.5s of its 1s budget
+    status, _ = supervisor.run_sites([('A', _site(1.5)), ('B', _site(0.5))], timeouts={'A': 5, 'B': 1}, breaker=breaker)
+    assert status == {'A': 'ok', 'B': 'ok'}
+
+def test_breaker_counts_consecutive_runs(tmp_path):
+    breaker = supervisor.CircuitBreaker(path=str(tmp_path / 'breaker.json'), limit=2, cooldown=1)
+    breaker.record('NYT', False)
+    assert not breaker.is_open('NYT')
+    breaker.record('NYT', False)
+    #   Sits out one run, then gets another try
+    assert breaker.is_open('NYT')
+    assert not breaker.is_open('NYT')
+    breaker.record('NYT', True)
+    assert breaker.state['NYT'] == {'failures': 0, 'skipped': 0}
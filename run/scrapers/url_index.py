@@ -0,0 +1,63 @@
+#=======================================
+#    url_index.py
+#        Persistent index of article urls we already have.
+#        SQLite on disk, seeded from articles.url, held in memory as a set for cheap lookups.
+#        Known urls still go through clustering, but skip the extra work (image lookup, keyword
+#        extraction, db insert), and a page of known urls is the signal to stop scrolling.
+#=======================================
+
+import sqlite3
+import threading
+
+INDEX_PATH = 'seen_urls.sqlite'
+
+class UrlIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY)")
+        self.conn.commit()
+        self.urls = {row[0] for row in self.conn.execute("SELECT url FROM urls")}
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def __len__(self):
+        return len(self.urls)
+
+    def add_many(self, urls):
+        new = [u for u in set(urls) if u and u not in self.urls]
+        if not new:
+            return 0
+        with self.lock:
+            self.conn.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", [(u,) for u in new])
+            self.conn.commit()
+            self.urls.update(new)
+        return len(new)
+
+    #   Pull every url already in the articles table
+    def seed_from_db(self, connection, batch_size=10000):
+        added = 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT url FROM articles")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                added += self.add_many(r[0] for r in rows)
+        return added
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = UrlIndex()
+        return _index
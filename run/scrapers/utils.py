@@ -1,69 +1,68 @@
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import DBSCAN
-from keybert import KeyBERT
 from collections import defaultdict
-from rapidfuzz import fuzz
-from sentence_transformers import SentenceTransformer, util
-from sklearn.cluster import AgglomerativeClustering
-import spacy
-import pandas as pd
-import numpy as np
-import psycopg2
-import requests
 import re
 import ast
 import warnings
-import boto3
 import json
 warnings.filterwarnings("ignore")
 
 #   Note: models Spacy and SentenceTransformer are saved in the 'models' folder.
+#   Importing this module is cheap and does nothing: spacy, torch, sklearn, pandas, psycopg2 and boto3
+#   are imported by the functions that use them, the first time they're called.
 
 #==================================================================================
 #       keyword_extraction
 #==================================================================================
 
-def init_keywords():
-    nlp = spacy.load('./models/spacy')
-    kw_model = KeyBERT()
-    weights = {'pos':1,'ner':2,'manual':1.1}
-    common_keywords = [
-        # Geopolitical and Regional Keywords
-        "israel", "palestine", "gaza", "russia", "ukraine", "china", 
-        "taiwan", "usa", "america", "iran", "india", "middle east", 
-        "north korea", "un", "eu", "border","u.s.","afghanistan","iraq",
-
-        # Technology and Business Keywords
-        "ai", "artificial intelligence", "machine learning", 
-        "cryptocurrency", "blockchain", "stocks", "economy", "recession", 
-        "inflation", "interest rates", "big tech", "startup", 
-        "ipo", "merger", "acquisition", "amazon", "google", "meta", "tesla",
-
-        # Political and Legal Keywords
-        "election", "president", "congress", "senate", "supreme court", 
-        "legislation", "sanctions", "campaign", "investigation", 
-        "impeachment", "protest", "vote", "ballot", "governor","government",
-
-        # Health and Environmental Keywords
-        "covid", "vaccine", "pandemic", "climate change", 
-        "global warming", "wildfire", "hurricane", "earthquake", 
-        "flood", "outbreak", "healthcare", "hospitals",
-
-        # Crime and Security Keywords
-        "hamas", "terrorism", "cybersecurity", "hacking", 
-        "police", "shooting", "arrest", "fbi", "war", 
-        "conflict", "defense", "military",'secret service',"immigration",
-
-        # Social and Cultural Keywords
-        "celebrity", "tiktok", "twitter", "x", "sports", 
-        "olympics", "world cup", "movies", "hollywood", 
-        "netflix", "protest", "rally", "social media", 
-        "influencer",
-
-        # Popular Politicians/People
-        #   Try only last names to avoid redunancy
-        "musk","trump","harris","biden","pelosi","obama"
-    ]
+SPACY_PATH = './models/spacy'
+SENTENCE_MODEL_PATH = './models/sentence_transformer'
+WEIGHTS = {'pos':1,'ner':2,'manual':1.1}
+COMMON_KEYWORDS = [
+    # Geopolitical and Regional Keywords
+    "israel", "palestine", "gaza", "russia", "ukraine", "china", 
+    "taiwan", "usa", "america", "iran", "india", "middle east", 
+    "north korea", "un", "eu", "border","u.s.","afghanistan","iraq",
+
+    # Technology and Business Keywords
+    "ai", "artificial intelligence", "machine learning", 
+    "cryptocurrency", "blockchain", "stocks", "economy", "recession", 
+    "inflation", "interest rates", "big tech", "startup", 
+    "ipo", "merger", "acquisition", "amazon", "google", "meta", "tesla",
+
+    # Political and Legal Keywords
+    "election", "president", "congress", "senate", "supreme court", 
+    "legislation", "sanctions", "campaign", "investigation", 
+    "impeachment", "protest", "vote", "ballot", "governor","government",
+
+    # Health and Environmental Keywords
+    "covid", "vaccine", "pandemic", "climate change", 
+    "global warming", "wildfire", "hurricane", "earthquake", 
+    "flood", "outbreak", "healthcare", "hospitals",
+
+    # Crime and Security Keywords
+    "hamas", "terrorism", "cybersecurity", "hacking", 
+    "police", "shooting", "arrest", "fbi", "war", 
+    "conflict", "defense", "military",'secret service',"immigration",
+
+    # Social and Cultural Keywords
+    "celebrity", "tiktok", "twitter", "x", "sports", 
+    "olympics", "world cup", "movies", "hollywood", 
+    "netflix", "protest", "rally", "social media", 
+    "influencer",
+
+    # Popular Politicians/People
+    #   Try only last names to avoid redunancy
+    "musk","trump","harris","biden","pelosi","obama"
+]
+
+#   sentence_model: share one SentenceTransformer between KeyBERT and get_similar_articles (load_sentence_model)
+def init_keywords(sentence_model=None):
+    import spacy
+    from keybert import KeyBERT
+    nlp = spacy.load(SPACY_PATH)
+    kw_model = KeyBERT(model=sentence_model) if sentence_model is not None else KeyBERT()
+    weights = dict(WEIGHTS)
+    #   Compiled once, each title is then scanned in one pass
+    common_keywords = KeywordMatcher(COMMON_KEYWORDS)
     return nlp,kw_model,common_keywords,weights
 
 #=========================================
@@ -72,7 +71,9 @@ def init_keywords():
 
 #   Part of Speech 
 def POS(title,nlp):
-    doc = nlp(title.lower())
+    return pos_from_doc(nlp(title.lower()))
+
+def pos_from_doc(doc):
     title_words = []
     # Focus on nouns, proper nouns, and (possibly) adjectives
     for token in doc:
@@ -84,7 +85,9 @@ def POS(title,nlp):
 
 #   Named Entity Recognition
 def NER(text,nlp):
-    doc = nlp(text)
+    return ner_from_doc(nlp(text))
+
+def ner_from_doc(doc):
     excluded_labels = ['DATE', 'ORDINAL', 'CARDINAL', 'MONEY', 'TIME', 'QUANTITY', 'PERCENT']  
     entities = [
         (ent.text, ent.label_) 
@@ -93,16 +96,55 @@ def NER(text,nlp):
     ]
     return entities
 
-def common_keyword_check(text,common_keywords):
-    normalized_headline = re.sub(r"[^\w\s']", "", text.lower())
-    words = normalized_headline.split()
+def normalize_headline(text):
+    return re.sub(r"[^\w\s']", "", text.lower())
+
+#   Token trie over the common keywords: {word: {word: ..., END: keyword}}
+#       A title is split into words once, and every phrase starting at each word is found by walking
+#       the trie, so matching costs words x (longest phrase) whatever the size of the keyword list.
+#       Matches are whole words only, anywhere in the title (including the last word).
+class KeywordMatcher:
+    END = object()
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.trie = {}
+        for kw in self.keywords:
+            words = normalize_headline(kw).split()
+            #   Keywords with punctuation ("u.s.") can't appear in a normalized headline, as before
+            if not words or ' '.join(words) != kw.lower():
+                continue
+            node = self.trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[self.END] = kw
+
+    def __iter__(self):
+        return iter(self.keywords)
+
+    def __contains__(self, kw):
+        return kw in self.keywords
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def match(self, text):
+        words = normalize_headline(text).split()
+        matches = set()
+        for i in range(len(words)):
+            node = self.trie
+            for word in words[i:]:
+                node = node.get(word)
+                if node is None:
+                    break
+                if self.END in node:
+                    matches.add(node[self.END])
+        return matches
 
-    matches = [word for word in words if word in common_keywords]
-    for kw in common_keywords:
-        cleaned_word = kw+' '
-        if cleaned_word in normalized_headline and kw not in matches:
-            matches.append(kw)
-    return set(matches)
+def common_keyword_check(text,common_keywords):
+    if not isinstance(common_keywords, KeywordMatcher):
+        common_keywords = KeywordMatcher(common_keywords)
+    return common_keywords.match(text)
 
 #=========================================
 #       Helper Functions
@@ -162,12 +204,124 @@ def get_keywords(title, nlp, kw_model, common_keywords, weights):
     
     return keywords
 
+#   Components POS lemmas and entities don't depend on
+UNUSED_PIPES = ('parser', 'senter', 'textcat', 'textcat_multilabel', 'spancat', 'entity_linker')
+SPACY_BATCH_SIZE = 256
+
+#       Batch version of get_keywords, same output for every title.
+#       spaCy runs once over all titles with nlp.pipe (unused components off) instead of twice per title.
+#       KeyBERT gets all titles in one call (candidate words embedded once for the batch). doc_embeddings,
+#       title embeddings from the same model KeyBERT was built with, skips embedding the titles again.
+#       POS reads the lowercased title and NER the original, like get_keywords, so each title is still
+#       parsed in both forms, interleaved into one nlp.pipe stream (one pass, one set of worker processes
+#       when n_process > 1). single_parse=True takes both from the original-case parse: half the spaCy
+#       work, but casing changes some tags, so keywords can differ a little from get_keywords.
+def get_keywords_batch(titles, nlp, kw_model, common_keywords, weights, batch_size=SPACY_BATCH_SIZE, n_process=1, single_parse=False, doc_embeddings=None):
+    titles = list(titles)
+    if not titles:
+        return []
+    disable = [name for name in nlp.pipe_names if name in UNUSED_PIPES]
+    def parse(texts):
+        return nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disable)
+
+    if single_parse:
+        docs = list(parse(titles))
+        pos_keywords = [[lemma.lower() for lemma in pos_from_doc(doc)] for doc in docs]
+    else:
+        #   lowercased, original, lowercased, original, ...
+        docs = list(parse(text for title in titles for text in (title.lower(), title)))
+        pos_keywords = [pos_from_doc(doc) for doc in docs[0::2]]
+        docs = docs[1::2]
+    ner_keywords = [ner_from_doc(doc) for doc in docs]
+
+    keybert_keywords = kw_model.extract_keywords(titles, doc_embeddings=doc_embeddings)
+    #   KeyBERT unwraps the result when given a single document
+    if len(titles) == 1:
+        keybert_keywords = [keybert_keywords]
+    #   ... and returns [] when no title has any candidate words left (zip would drop every title)
+    if len(keybert_keywords) < len(titles):
+        keybert_keywords = list(keybert_keywords) + [[] for _ in range(len(titles) - len(keybert_keywords))]
+
+    keywords = []
+    for title, pos, ner, kbrt in zip(titles, pos_keywords, ner_keywords, keybert_keywords):
+        manually_found = common_keyword_check(title, common_keywords)
+        keywords.append(aggegate_keywords(weights, pos, ner, kbrt, manually_found))
+    return keywords
+
+#=========================================
+#       Fast (model free) keywords
+#           Same scheme as get_keywords, with a rule standing in for each model:
+#               POS     -> words that aren't stopwords/numbers (lemma: possessive 's dropped)
+#               NER     -> runs of capitalized words, mid-sentence (skipped on Title Case headlines,
+#                          where capitals say nothing)
+#               KeyBERT -> the FAST_TOP_N longest candidate words (capitalized ones first) at FAST_CONFIDENCE
+#           Microseconds per title instead of seconds, for backfills and reruns. See bench_keywords.py
+#           for how close it gets to get_keywords.
+#=========================================
+FAST_TOP_N = 5              # KeyBERT's default top_n
+FAST_CONFIDENCE = 0.6       # Typical KeyBERT score for a headline's top words
+STOPWORDS = set("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers herself him himself his how i if in into is it its itself just me more most my myself no nor not now of off
+on once only or other our ours ourselves out over own same says say said she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours yourself yourselves new over amid after back
+get gets got make makes made take takes one two first last year years day days week weeks
+""".split())
+
+def _fast_clean(word):
+    #   Possessive 's and stray quotes off, case kept
+    if word.lower().endswith("'s"):
+        word = word[:-2]
+    return word.strip("'")
+
+def _fast_words(title):
+    #   (original, lowercased) words, punctuation stripped like normalize_headline.
+    #   Single letters go ("U.S." would otherwise leave 'u' and 's')
+    words = [_fast_clean(w) for w in re.sub(r"[^\w\s']", " ", title).split()]
+    return [(w, w.lower()) for w in words if len(w) > 1]
+
+def fast_pos(title):
+    return [word for _, word in _fast_words(title) if len(word) > 2 and word not in STOPWORDS and not word.isdigit()]
+
+def fast_ner(title):
+    words = _fast_words(title)
+    capitalized = [w[:1].isupper() for w, _ in words]
+    #   Title Case headline: capitals don't mark names
+    if words and sum(capitalized) / len(words) > 0.6:
+        return []
+    entities, run = [], []
+    for i, ((word, lower), cap) in enumerate(zip(words, capitalized)):
+        if cap and i > 0 and lower not in STOPWORDS:
+            run.append(word)
+            continue
+        if run:
+            entities.append((' '.join(run), 'FAST'))
+        run = []
+    if run:
+        entities.append((' '.join(run), 'FAST'))
+    return entities
+
+def fast_keybert(title, pos):
+    capitalized = {lower for word, lower in _fast_words(title) if word[:1].isupper()}
+    ranked = sorted(dict.fromkeys(pos), key=lambda w: (w in capitalized, len(w)), reverse=True)
+    return [(word, FAST_CONFIDENCE) for word in ranked[:FAST_TOP_N]]
+
+def get_keywords_fast(title, common_keywords, weights):
+    pos_keywords = fast_pos(title)
+    ner_keywords = fast_ner(title)
+    keybert_keywords = fast_keybert(title, pos_keywords)
+    manually_found = common_keyword_check(title, common_keywords)
+    return aggegate_keywords(weights, pos_keywords, ner_keywords, keybert_keywords, manually_found)
+
 #==================================================================================
 #       dbconnect
 #==================================================================================
 
 
 def connect_db():
+    import psycopg2
     # Establish the connection to PostgreSQL
     connection = psycopg2.connect(
         dbname='go',
@@ -252,91 +406,242 @@ def remove_duplicates_article_rows(article_df):
     return article_df_cleaned
 
 
-def get_similar_articles(article_df):
+def load_sentence_model():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SENTENCE_MODEL_PATH)
+
+SIM_THRESH = 0.9               # Weighted similarity for two articles to count as the same story
+DENSE_MAX_ARTICLES = 5000       # Above this get_similar_articles uses the sparse neighbor graph (n x n floats get big)
+NEIGHBOR_BLOCK = 1024           # Rows per block in similarity_edges
+
+#   Keyword list per article. Keywords used to be stored as strings, convert those back to lists
+def parse_keywords(keywords):
+    return [ast.literal_eval(k) if isinstance(k, str) else (list(k) if k is not None else []) for k in keywords]
+
+#   Sparse multi-hot article x keyword matrix (each keyword counted once per article).
+#       return_vocab: also return the keywords in column order
+def keyword_matrix(keywords, return_vocab=False):
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    vocab = {}
+    indices, indptr = [], [0]
+    for kws in parse_keywords(keywords):
+        indices.extend(vocab.setdefault(kw, len(vocab)) for kw in set(kws))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int32)
+    matrix = csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(vocab)))
+    return (matrix, list(vocab)) if return_vocab else matrix
+
+#   Source diversity and keyword overlap adjustments to cosine similarities (element wise):
+#       +0.1 for different sources, -0.5 for the same source, +0.033 per keyword in common.
+#   Same values as the old per pair loop: each step is done in the type numpy used for
+#   matrix[i,j] += <python float> (float64 for a float32 matrix on numpy 1.x) and rounded back to
+#   the matrix dtype.
+def adjust_similarity(similarity, same_source, shared):
+    import numpy as np
+    dtype = similarity.dtype
+    step = np.dtype(type(dtype.type(0) + 0.1))
+    source_adjust = np.where(same_source, -0.5, 0.1).astype(step)
+    adjusted = (similarity.astype(step) + source_adjust).astype(dtype)
+    return (adjusted.astype(step) + (shared * 0.033).astype(step)).astype(dtype)
+
+def source_codes(sources):
+    import pandas as pd
+    codes, _ = pd.factorize(pd.Series(list(sources), dtype=object))
+    return codes
+
+#   Weighted similarity matrix: the upper triangle is adjusted and mirrored, the diagonal is left alone
+def weight_similarity(similarity_matrix, sources, keywords):
+    import numpy as np
+    n = similarity_matrix.shape[0]
+    codes = source_codes(sources)
+    #   K.Kt: number of keywords each pair has in common
+    k = keyword_matrix(keywords)
+    shared = (k @ k.T).toarray()
+    adjusted = adjust_similarity(similarity_matrix, codes[:, None] == codes[None, :], shared)
+
+    upper = np.triu_indices(n, 1)
+    weighted = similarity_matrix.copy()
+    weighted[upper] = adjusted[upper]
+    weighted[upper[1], upper[0]] = adjusted[upper]
+    return weighted
+
+#   Pairs (i < j) within 1 - sim_thresh of each other (1 - clipped weighted similarity), one block of
+#       rows at a time. Same pairs and weights as the dense matrix, but memory is block_size x n
+#       instead of n x n, so multi-day windows fit.
+def similarity_edges(embeddings, sources, keywords, sim_thresh=SIM_THRESH, block_size=NEIGHBOR_BLOCK):
+    import numpy as np
+    from sklearn.preprocessing import normalize
+    #   Unit length rows: cosine similarity is a dot product (what cosine_similarity does)
+    normalized = normalize(np.asarray(embeddings))
+    n = normalized.shape[0]
+    codes = source_codes(sources)
+    k = keyword_matrix(keywords)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        #   Upper triangle only (j > i), like weight_similarity
+        similarity = normalized[start:stop] @ normalized[start:].T
+        same = codes[start:stop, None] == codes[None, start:]
+        shared = (k[start:stop] @ k[start:].T).toarray()
+        distance = 1 - np.clip(adjust_similarity(similarity, same, shared), 0, 1)
+        i, j = np.nonzero(np.triu(distance <= 1 - sim_thresh, 1))
+        yield i + start, j + start, distance[i, j]
+
+#   Pairs within 1 - sim_thresh in an already computed (clipped, weighted) similarity matrix
+def matrix_edges(similarity_matrix, sim_thresh=SIM_THRESH):
+    import numpy as np
+    distance = 1 - similarity_matrix
+    i, j = np.nonzero(np.triu(distance <= 1 - sim_thresh, 1))
+    yield i, j, distance[i, j]
+
+class UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            #   Path halving
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size[j]
+
+#   Cluster labels from edges, streamed into a union-find: linear in n + edges.
+#       Same labels as DBSCAN(metric='precomputed', eps=1-sim_thresh, min_samples=2): with
+#       min_samples=2 every article with a neighbor is a core point, so clusters are the connected
+#       components, articles without a neighbor are noise (-1), and clusters are numbered in order of
+#       their first article.
+def cluster_labels(n, edges):
+    import numpy as np
+    components = UnionFind(n)
+    for rows, cols, _ in edges:
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            components.union(i, j)
+    labels = np.full(n, -1, dtype=np.int64)
+    numbers = {}
+    for i in range(n):
+        root = components.find(i)
+        if components.size[root] > 1:
+            labels[i] = numbers.setdefault(root, len(numbers))
+    return labels
+
+#   Weighted, clipped similarity of arbitrary pairs (rows[i], cols[i]), same values as the full matrix.
+#       Each pair is computed as (lower index, higher index), like the matrix's upper triangle.
+def pair_similarity(normalized, codes, keyword_counts, rows, cols):
+    import numpy as np
+    first, second = np.minimum(rows, cols), np.maximum(rows, cols)
+    similarity = np.einsum('ij,ij->i', normalized[first], normalized[second])
+    shared = np.asarray(keyword_counts[first].multiply(keyword_counts[second]).sum(axis=1)).ravel()
+    return np.clip(adjust_similarity(similarity, codes[first] == codes[second], shared), 0, 1)
+
+#   Every ordered pair (i, j), i != j, of articles in the same cluster, without looping over clusters
+def cluster_pairs(labels):
+    import numpy as np
+    members = np.flatnonzero(labels >= 0)
+    members = members[np.argsort(labels[members], kind='stable')]
+    member_labels = labels[members]
+    sizes = np.bincount(member_labels)
+    group_start = np.cumsum(sizes) - sizes      # Position of each cluster's first member in members
+    #   Member p is paired with every member of its cluster (per_member[p] pairs)
+    per_member = sizes[member_labels]
+    first = np.repeat(np.arange(len(members)), per_member)
+    offset = np.arange(len(first)) - np.repeat(np.cumsum(per_member) - per_member, per_member)
+    second = np.repeat(group_start[member_labels], per_member) + offset
+    rows, cols = members[first], members[second]
+    keep = rows != cols
+    return rows[keep], cols[keep]
+
+#   One row per cluster: headlines and URLs in article order, keywords every article in the cluster
+#       has, and the mean weighted similarity over all pairs in the cluster (rounded to 2 places).
+#       pair_values are the similarities of cluster_pairs(labels), summed per cluster as the
+#       diagonal blocks of L^T W L (L: article x cluster indicator, W: pair similarities).
+def cluster_table(article_df, labels, pair_rows, pair_cols, pair_values, keyword_counts, vocab):
+    import numpy as np
+    import pandas as pd
+    from scipy.sparse import csr_matrix
+    columns = ['Article Headlines', 'Article URLs', 'Keywords', 'Similarity Weights']
+    clustered = labels >= 0
+    if not clustered.any():
+        return pd.DataFrame(columns=columns)
+    n, count = len(labels), labels.max() + 1
+    indicator = csr_matrix((np.ones(clustered.sum()), (np.flatnonzero(clustered), labels[clustered])), shape=(n, count))
+    sizes = np.asarray(indicator.sum(axis=0)).ravel()
+
+    pairs = csr_matrix((pair_values.astype(np.float64), (pair_rows, pair_cols)), shape=(n, n))
+    block_sums = (indicator.T @ pairs @ indicator).diagonal()
+    weights = block_sums / (sizes * (sizes - 1))
+
+    #   Keywords in every article of the cluster: cluster x keyword counts equal to the cluster size
+    keyword_hits = (indicator.T @ keyword_counts).tocoo()
+    full = keyword_hits.data == sizes[keyword_hits.row]
+    shared = defaultdict(list)
+    for cluster, keyword in sorted(zip(keyword_hits.row[full].tolist(), keyword_hits.col[full].tolist())):
+        shared[cluster].append(vocab[keyword])
+
+    grouped = article_df.loc[clustered, ['Article Title', 'Article URL']].groupby(labels[clustered], sort=True)
+    return pd.DataFrame({
+        'Article Headlines': grouped['Article Title'].agg(list).tolist(),
+        'Article URLs': grouped['Article URL'].agg(list).tolist(),
+        'Keywords': [shared[c] for c in range(count)],
+        'Similarity Weights': [round(float(w), 2) for w in weights],
+    }, columns=columns)
+
+#   embeddings: title embeddings in row order, if already computed (nlp_stream)
+def get_similar_articles(article_df, embeddings=None):
+    import numpy as np
+    from sklearn.metrics.pairwise import cosine_similarity
+    from sklearn.preprocessing import normalize
     # Initialize
-    model = SentenceTransformer('./models/sentence_transformer')
     titles = article_df['Article Title'].tolist()
     keywords = article_df['Keywords'].tolist()
     sources = article_df['Source'].tolist()
-    embeddings = model.encode(titles)
-    simart_df = pd.DataFrame(columns=['Article Headlines', 'Article URLs', 'Keywords', 'Similarity Weights'])
-
-    #   Get cosine similarity
-    similarity_matrix = cosine_similarity(embeddings)
-
-    #   Iterate through similarity matrix and emphasize weights of clusters with:
-    #       - Diversity of sources
-    #       - Common keywords
-    for i in range(len(article_df)):
-        for j in range(i + 1,len(article_df)):
-            #   Diversity of Sources
-            if sources[i] != sources[j]:
-                similarity_matrix[i,j] += 0.1
-            else:
-                similarity_matrix[i,j] -= 0.5
-            #   Keywords in Common
-            #       For some reason, keywords are stored as strings. Convert back to list, then get set
-            if isinstance(keywords[i], str):
-                s1 = set(ast.literal_eval(keywords[i]))
-            else:
-                s1 = set(keywords[i])
-            if isinstance(keywords[j], str):
-                s2 = set(ast.literal_eval(keywords[j]))
-            else:
-                s2 = set(keywords[j])
-            keyword_match_count = len(s1.intersection(s2))
-
-            similarity_matrix[i,j] += keyword_match_count*0.033
-            #   Maintain symmetry
-            similarity_matrix[j,i] = similarity_matrix[i,j]
-
-    #   Clip to avoid negative weights. Slightly alters matches, however DBSCAN cannot take negative weights.
-    #       This will only affect the least-similar articles, making them slightly more similar. 
-    #       (They will be cut by the similarity threshold anyways)
-    similarity_matrix = np.clip(similarity_matrix, 0, 1)
-    sim_thresh = 0.9
-    clustering = DBSCAN(metric='precomputed',eps=1-sim_thresh,min_samples=2)
-    labels = clustering.fit_predict(1-similarity_matrix)
-
-    # Tie 'labels' group back to article titles
-    cluster_dict = defaultdict(list)
-    for label, row in zip(labels, article_df.iterrows()):  # Iterate over DataFrame rows
-        index, row_data = row  # Unpack index and the row's data
-        if label != -1:  # Exclude articles with no cluster
-            cluster_dict[label].append(row_data)  
-
-    # Calculate similarity score for each cluster
-    cluster_similarity_scores = {}
-    for label in set(labels):
-        if label != -1:  # Ignore noise points (articles without clusters)
-            # Get indices of articles in the current cluster
-            cluster_indices = [i for i, lbl in enumerate(labels) if lbl == label]
-            # Calculate average similarity within the cluster
-            cluster_similarities = [similarity_matrix[i, j] for i in cluster_indices for j in cluster_indices if i != j]
-            cluster_similarity_scores[label] = np.mean(cluster_similarities) if cluster_similarities else 0
-
-    # Print clusters and similarity scores
-    for cluster_id, articles in cluster_dict.items():
-        similarity_weight = round(float(cluster_similarity_scores[cluster_id]),2)
-        #print(f"Cluster {cluster_id} (Similarity Score: {similarity_weight}):")
-        url_clust = [article['Article URL'] for article in articles]
-        title_clust = [article['Article Title'] for article in articles]
-        # Get Keywords shared by all articles
-        #   Aggregate keyword lists from each title into a 2d list
-        raw_keywords_clust = [article['Keywords'] for article in articles]
-        raw_keywords_clust = [ast.literal_eval(keywords) if isinstance(keywords, str) else keywords for keywords in raw_keywords_clust]
-        #   Start with the set of the first article's keywords
-        keywords_clust = set(raw_keywords_clust[0])
-        #   Get all interesection keywords (those that appear in all)
-        for sublst in raw_keywords_clust[1:]:
-            keywords_clust.intersection_update(sublst)
-        keywords_clust = list(keywords_clust)
-        simart_df.loc[len(simart_df)] = [title_clust,url_clust,keywords_clust,similarity_weight]
-    
-    return simart_df
+    if embeddings is None:
+        model = load_sentence_model()
+        embeddings = model.encode(titles)
+
+    if len(article_df) <= DENSE_MAX_ARTICLES:
+        #   Get cosine similarity
+        similarity_matrix = cosine_similarity(embeddings)
+
+        #   Emphasize weights of clusters with:
+        #       - Diversity of sources
+        #       - Common keywords
+        similarity_matrix = weight_similarity(similarity_matrix, sources, keywords)
+
+        #   Clip to avoid negative weights. Slightly alters matches (distances stay in [0, 1]).
+        #       This will only affect the least-similar articles, making them slightly more similar. 
+        #       (They will be cut by the similarity threshold anyways)
+        similarity_matrix = np.clip(similarity_matrix, 0, 1)
+        edges = matrix_edges(similarity_matrix)
+    else:
+        #   Multi-day windows: only pairs above the threshold are kept, memory grows with n instead of n^2
+        edges = similarity_edges(embeddings, sources, keywords)
+    #   Connected components of the pairs above the threshold (what DBSCAN with min_samples=2 finds)
+    labels = cluster_labels(len(article_df), edges)
+
+    #   Similarity of every pair inside a cluster, for the cluster weights
+    keyword_counts, vocab = keyword_matrix(keywords, return_vocab=True)
+    rows, cols = cluster_pairs(labels)
+    if len(article_df) <= DENSE_MAX_ARTICLES:
+        values = similarity_matrix[rows, cols]
+    else:
+        values = pair_similarity(normalize(np.asarray(embeddings)), source_codes(sources), keyword_counts, rows, cols)
+
+    return cluster_table(article_df.reset_index(drop=True), labels, rows, cols, values, keyword_counts, vocab)
 
 #   Start the 2nd instance
 def trigger_second_instance():
+    import boto3
     try:
         lambda_client = boto3.client('..')
         response = lambda_client.invoke(
@@ -355,6 +660,7 @@ def trigger_second_instance():
 #       Send article text df to bucket for summarizing
 #==================================================================================
 def send_to_bkt():
+    import pandas as pd
     connection = connect_db()
     df = pd.read_sql_query("""
         SELECT 
@@ -381,5 +687,3 @@ def send_to_bkt():
     completed_check = pd.DataFrame({'status':['incomplete']})
     completed_check.to_csv('s3://news.summ.bkt/completed.txt', index=False)
     df.to_csv('s3://news.summ.bkt/unsummarized.csv', index=False)
-
-send_to_bkt()
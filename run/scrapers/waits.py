@@ -0,0 +1,122 @@
+#=======================================
+#    waits.py
+#        Condition based waits and bounded retries for the scrapers.
+#        Everything here has a deadline, nothing sleeps longer than it needs to.
+#=======================================
+
+import time
+
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import ElementNotInteractableException
+
+#   Exceptions that just mean "not yet" while polling
+IGNORED = (NoSuchElementException, StaleElementReferenceException, ElementNotInteractableException)
+
+#===================================================================================
+#   Deadlines / retry
+#===================================================================================
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.end = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.end - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.end
+
+def backoff_delays(delay=0.05, factor=2.0, max_delay=1.0):
+    while True:
+        yield delay
+        delay = min(delay * factor, max_delay)
+
+def wait_for(driver, condition, timeout=10, delay=0.05, factor=1.5, max_delay=0.5, message=''):
+    """
+    Poll condition(driver) with exponential backoff until it returns something truthy, and return it.
+
+    Raises:
+        TimeoutException: If the condition isn't met before the deadline.
+    """
+    deadline = Deadline(timeout)
+    for pause in backoff_delays(delay, factor, max_delay):
+        try:
+            value = condition(driver)
+            if value:
+                return value
+        except IGNORED:
+            pass
+        if deadline.expired():
+            raise TimeoutException(message or f"Condition not met within {timeout}s")
+        time.sleep(min(pause, deadline.remaining()))
+
+def retry(fn, attempts=5, timeout=None, delay=0.1, factor=2.0, max_delay=2.0, exceptions=(Exception,), on_retry=None):
+    """
+    Call fn() until it succeeds, at most `attempts` times and within `timeout` seconds.
+    Re-raises the last error once out of attempts or time. on_retry() runs between attempts.
+    """
+    deadline = Deadline(timeout) if timeout is not None else None
+    pauses = backoff_delays(delay, factor, max_delay)
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except exceptions:
+            if attempt == attempts - 1 or (deadline is not None and deadline.expired()):
+                raise
+        if on_retry is not None:
+            on_retry()
+        pause = next(pauses)
+        time.sleep(min(pause, deadline.remaining()) if deadline is not None else pause)
+
+#===================================================================================
+#   Conditions
+#       Factories returning callables that take the driver, for wait_for.
+#===================================================================================
+def element_present(by, value):
+    def _check(driver):
+        return driver.find_element(by, value)
+    return _check
+
+def element_visible(by, value):
+    def _check(driver):
+        ele = driver.find_element(by, value)
+        return ele if ele.is_displayed() else False
+    return _check
+
+def element_clickable(by, value):
+    def _check(driver):
+        ele = driver.find_element(by, value)
+        return ele if ele.is_displayed() and ele.is_enabled() else False
+    return _check
+
+def element_count_stable(css, checks=2):
+    """True once the number of nodes matching `css` is non-zero and unchanged for `checks` polls in a row."""
+    state = {'count': None, 'same': 0}
+    def _check(driver):
+        count = driver.execute_script("return document.querySelectorAll(arguments[0]).length;", css)
+        if count and count == state['count']:
+            state['same'] += 1
+        else:
+            state['count'], state['same'] = count, 0
+        return state['same'] >= checks - 1 and count > 0
+    return _check
+
+def network_idle(quiet=0.2):
+    """True once the page has loaded and no new resources have been fetched for `quiet` seconds."""
+    state = {'count': None, 'since': None}
+    def _check(driver):
+        ready, count = driver.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length];")
+        now = time.monotonic()
+        if ready != 'complete' or count != state['count']:
+            state['count'], state['since'] = count, now
+            return False
+        return now - state['since'] >= quiet
+    return _check
+
+def settle(driver, timeout=2, quiet=0.2):
+    #   Best effort: give lazy content a chance to load, carry on either way
+    try:
+        wait_for(driver, network_idle(quiet), timeout=timeout)
+    except TimeoutException:
+        pass